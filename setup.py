@@ -0,0 +1,26 @@
+"""Optional compiled build of the pure-Python scoring and report modules.
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+This places compiled extensions next to ``src/analysis/report.py`` and
+``scoring.py``; Python imports them in preference to the sources. Without
+Cython installed this is a plain setuptools shim and everything runs as
+regular Python. Delete the generated ``.so`` files to go back.
+"""
+
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        ["src/analysis/report.py", "src/analysis/scoring.py"],
+        compiler_directives={"language_level": "3"},
+        quiet=True,
+    )
+
+# The repo runs from source with `src` as a top-level package, not an src-layout
+setup(ext_modules=ext_modules, package_dir={"": "."}, packages=[])
@@ -0,0 +1,145 @@
+"""Persistent cache of parsed LLM analyses for repeated topic/result sets."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+from src.config import (
+    LLM_CACHE_MIN_SIMILARITY,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    group_key TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_group ON analyses (group_key);
+"""
+
+
+def _digest(data: dict) -> str:
+    return hashlib.blake2b(
+        json.dumps(data, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed cache keyed on the result set and a bucketed topic embedding.
+
+    Entries are grouped by (sorted publication IDs, branch, variant), where
+    ``variant`` fingerprints everything else the response depends on (model,
+    prompt version, additional context). An exact hit requires the same
+    embedding bucket; otherwise any entry in the group whose topic embedding
+    has cosine similarity >= ``min_similarity`` is returned as a
+    near-duplicate.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        min_similarity: float = LLM_CACHE_MIN_SIMILARITY,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.min_similarity = min_similarity
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @staticmethod
+    def _keys(
+        proposal_embedding: np.ndarray, pub_ids: list[str], branch: str, variant: str
+    ) -> tuple[str, str]:
+        group = {"pub_ids": sorted(pub_ids), "branch": branch, "variant": variant}
+        bucket = np.round(np.asarray(proposal_embedding) * 32).astype(np.int8)
+        key = _digest({**group, "emb_bucket": bucket.tolist()})
+        return key, _digest(group)
+
+    def lookup(
+        self,
+        proposal_embedding: np.ndarray,
+        pub_ids: list[str],
+        branch: str,
+        variant: str = "",
+    ) -> dict | None:
+        """Return the cached LLM response for this topic/result set, if any."""
+        key, group_key = self._keys(proposal_embedding, pub_ids, branch, variant)
+        cutoff = time.time() - self.ttl_seconds
+
+        row = self._conn.execute(
+            "SELECT payload FROM analyses WHERE key = ? AND created >= ?",
+            (key, cutoff),
+        ).fetchone()
+        if row:
+            return orjson.loads(row[0])
+
+        query = np.asarray(proposal_embedding, dtype=np.float32)
+        best_sim, best_payload = -1.0, None
+        for emb_blob, payload in self._conn.execute(
+            "SELECT embedding, payload FROM analyses WHERE group_key = ? AND created >= ?",
+            (group_key, cutoff),
+        ):
+            emb = np.frombuffer(emb_blob, dtype=np.float32)
+            if emb.shape != query.shape:
+                continue
+            sim = float(emb @ query)
+            if sim > best_sim:
+                best_sim, best_payload = sim, payload
+
+        if best_payload is not None and best_sim >= self.min_similarity:
+            logger.info("LLM cache near-match (cosine=%.3f)", best_sim)
+            return orjson.loads(best_payload)
+        return None
+
+    def store(
+        self,
+        proposal_embedding: np.ndarray,
+        pub_ids: list[str],
+        branch: str,
+        parsed: dict,
+        variant: str = "",
+    ) -> None:
+        """Store a parsed LLM response and evict expired entries."""
+        key, group_key = self._keys(proposal_embedding, pub_ids, branch, variant)
+        now = time.time()
+        emb_blob = np.asarray(proposal_embedding, dtype=np.float32).tobytes()
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM analyses WHERE created < ?", (now - self.ttl_seconds,)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)",
+                (key, group_key, emb_blob, orjson.dumps(parsed).decode(), now),
+            )
+
+
+_cache: AnalysisCache | None = None
+
+
+def get_analysis_cache() -> AnalysisCache | None:
+    """Return the shared cache, or None when caching is disabled."""
+    global _cache
+    if not LLM_CACHE_PATH:
+        return None
+    if _cache is None:
+        _cache = AnalysisCache(LLM_CACHE_PATH)
+    return _cache
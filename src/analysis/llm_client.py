@@ -2,23 +2,33 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
 import logging
 import os
+import time
 
 import anthropic
+import numpy as np
+import orjson
 
-from src.config import LLM_MAX_TOKENS, LLM_MODEL
+from src.config import (
+    LLM_BATCH_POLL_SECONDS,
+    LLM_MAX_TOKENS,
+    LLM_MODEL,
+    PROMPT_CACHE_KEEPALIVE_IDLE_SECONDS,
+    PROMPT_CACHE_KEEPALIVE_SECONDS,
+    PROMPT_CACHE_MIN_CHARS,
+)
+from src.analysis.llm_cache import get_analysis_cache
 from src.analysis.prompts import (
+    ANALYSIS_INSTRUCTIONS,
+    PROMPT_VERSION,
     SYSTEM_PROMPT,
     build_analysis_prompt,
     format_publications_for_prompt,
 )
-from src.analysis.scoring import (
-    compute_confidence,
-    compute_overlap_rating,
-    compute_verdict,
-)
+from src.analysis.scoring import score_all
 from src.models import (
     AnalysisReport,
     MilitaryBranch,
@@ -30,36 +40,54 @@ from src.models import (
 
 logger = logging.getLogger(__name__)
 
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+# Leading characters of a normalized title used for prefix matching
+_TITLE_PREFIX_LEN = 40
+
+# System prompt as a cacheable block — it prefixes every request unchanged
+_SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_PROMPT, "cache_control": _CACHE_CONTROL},
+]
+_INSTRUCTIONS_BLOCK = {
+    "type": "text", "text": ANALYSIS_INSTRUCTIONS, "cache_control": _CACHE_CONTROL,
+}
+
+_keepalive_task: asyncio.Task | None = None
+_last_analysis = 0.0
+# Cached user-content blocks of the most recent analysis, re-sent by the keep-alive
+_keepalive_prefix: list[dict] | None = None
+_keepalive_warned = False
 
-def _results_to_prompt_dicts(results: list[SimilarityResult]) -> list[dict]:
-    """Convert SimilarityResult list to dicts for prompt formatting."""
-    pub_dicts = []
-    for r in results:
-        pub = r.publication
-        pub_dicts.append({
-            "id": pub.id,
-            "title": pub.title,
-            "abstract": pub.best_abstract,
-            "pub_year": pub.pub_year,
-            "authors": ", ".join(pub.authors) if pub.authors else "Unknown",
-            "journal_title": pub.journal_title,
-            "detected_branches": [b.value for b in pub.detected_branches],
-            "times_cited": pub.times_cited,
-            "similarity_score": r.similarity_score,
-        })
-    return pub_dicts
+
+def _build_user_content(cacheable_prefix: str, variable_suffix: str) -> list[dict]:
+    """Assemble the user message as content blocks with cache breakpoints.
+
+    Order is static instructions → publications → topic-specific fields, so
+    the longest stable prefix is reused across repeated analyses. The
+    publications block only gets a breakpoint when it is long enough to be
+    cached by the API.
+    """
+    publications_block: dict = {"type": "text", "text": cacheable_prefix}
+    if len(cacheable_prefix) >= PROMPT_CACHE_MIN_CHARS:
+        publications_block["cache_control"] = _CACHE_CONTROL
+    return [
+        _INSTRUCTIONS_BLOCK,
+        publications_block,
+        {"type": "text", "text": variable_suffix},
+    ]
 
 
 def _parse_llm_response(text: str) -> dict:
     """Parse the JSON response from the LLM, handling potential markdown fences."""
     cleaned = text.strip()
-    # Remove markdown code fences if present
     if cleaned.startswith("```"):
-        lines = cleaned.split("\n")
-        # Remove first and last lines (fences)
-        lines = [l for l in lines if not l.strip().startswith("```")]
-        cleaned = "\n".join(lines)
-    return json.loads(cleaned)
+        # Drop the opening ```/```json line and a closing fence at the very end
+        _, newline, rest = cleaned.partition("\n")
+        cleaned = rest if newline else cleaned[3:]
+        if cleaned.endswith("```"):
+            cleaned = cleaned[:-3]
+    return orjson.loads(cleaned)
 
 
 def _build_precomputed_metrics_text(
@@ -83,39 +111,52 @@ def _build_precomputed_metrics_text(
     return "\n".join(lines)
 
 
-async def analyze_uniqueness(
-    proposal: UserProposal,
-    similarity_results: list[SimilarityResult],
-    search_queries_used: list[str],
-) -> AnalysisReport:
-    """Send the topic and similar publications to Claude for landscape analysis."""
+@functools.lru_cache(maxsize=1)
+def _make_client() -> anthropic.AsyncAnthropic:
+    """Return the shared async client, creating it on first use.
+
+    One client is reused for every request so its HTTP connection pool
+    (and TLS sessions) carries over between analyses. A missing API key
+    raises before anything is cached, so setting it later still works.
+    """
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY environment variable is required")
+    return anthropic.AsyncAnthropic(api_key=api_key, max_retries=2, timeout=120.0)
 
-    # Compute deterministic metrics before LLM call
-    overlap_ratings = [
-        compute_overlap_rating(r.similarity_score) for r in similarity_results
-    ]
-    verdict = compute_verdict(
-        similarity_results, overlap_ratings, proposal.military_branch.value
+
+def _compute_metrics(
+    proposal: UserProposal,
+    similarity_results: list[SimilarityResult],
+) -> tuple[list[str], Verdict, float]:
+    """Compute deterministic overlap ratings, verdict, and confidence."""
+    overlap_ratings, verdict, confidence = score_all(
+        similarity_results, proposal.military_branch.value
     )
-    confidence = compute_confidence(similarity_results, overlap_ratings, verdict)
 
     logger.info(
         "Computed metrics: verdict=%s confidence=%.2f overlaps=%s",
         verdict.value, confidence,
         {r: overlap_ratings.count(r) for r in ("high", "medium", "low")},
     )
+    return overlap_ratings, verdict, confidence
 
-    pub_dicts = _results_to_prompt_dicts(similarity_results)
-    publications_text = format_publications_for_prompt(pub_dicts)
+
+def _build_request_params(
+    proposal: UserProposal,
+    similarity_results: list[SimilarityResult],
+    overlap_ratings: list[str],
+    verdict: Verdict,
+    confidence: float,
+) -> dict:
+    """Build the Messages API parameters for one analysis."""
+    publications_text = format_publications_for_prompt(similarity_results)
 
     precomputed_text = _build_precomputed_metrics_text(
         similarity_results, overlap_ratings, verdict, confidence
     )
 
-    user_prompt = build_analysis_prompt(
+    cacheable_prefix, variable_suffix = build_analysis_prompt(
         proposal_title=proposal.title,
         proposal_abstract=proposal.topic_description or proposal.abstract,
         proposal_keywords=proposal.keywords,
@@ -125,58 +166,193 @@ async def analyze_uniqueness(
         precomputed_metrics=precomputed_text,
     )
 
+    return {
+        "model": LLM_MODEL,
+        "max_tokens": LLM_MAX_TOKENS,
+        "temperature": 0.7,
+        "system": _SYSTEM_BLOCKS,
+        "messages": [{
+            "role": "user",
+            "content": _build_user_content(cacheable_prefix, variable_suffix),
+        }],
+    }
+
+
+def _log_response(response_text: str, usage) -> None:
+    logger.info(
+        "Received LLM response (%d chars; cache read=%s write=%s input=%s tokens)",
+        len(response_text),
+        getattr(usage, "cache_read_input_tokens", None),
+        getattr(usage, "cache_creation_input_tokens", None),
+        usage.input_tokens,
+    )
+
+
+async def _request_analysis(params: dict) -> str:
+    """Call Claude with prepared parameters and return the raw response text.
+
+    The response is streamed so long completions are not held behind a
+    single HTTP read timeout; text is accumulated as it arrives.
+    """
+    client = _make_client()
     logger.info("Sending analysis request to Claude (%s)", LLM_MODEL)
+    chunks: list[str] = []
+    async with client.messages.stream(**params) as stream:
+        async for text in stream.text_stream:
+            chunks.append(text)
+        message = await stream.get_final_message()
+
+    response_text = "".join(chunks)
+    _log_response(response_text, message.usage)
+    return response_text
+
+
+def _cacheable_prefix(user_content: list[dict]) -> list[dict] | None:
+    """Leading user-content blocks the API will actually cache, or None.
 
-    client = anthropic.Anthropic(api_key=api_key)
-    message = client.messages.create(
-        model=LLM_MODEL,
-        max_tokens=LLM_MAX_TOKENS,
-        temperature=0.7,
-        system=SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_prompt}],
+    That is instructions + publications when the publications block carries a
+    breakpoint, otherwise the instructions alone if the static prefix is long
+    enough on its own.
+    """
+    if "cache_control" in user_content[1]:
+        return user_content[:2]
+    if len(SYSTEM_PROMPT) + len(ANALYSIS_INSTRUCTIONS) >= PROMPT_CACHE_MIN_CHARS:
+        return user_content[:1]
+    return None
+
+
+def _keepalive_params(prefix_blocks: list[dict]) -> dict:
+    """Minimal request sharing the system prompt and cached user blocks of an analysis."""
+    return {
+        "model": LLM_MODEL,
+        "max_tokens": 1,
+        "system": _SYSTEM_BLOCKS,
+        "messages": [{
+            "role": "user",
+            "content": [*prefix_blocks, {"type": "text", "text": "."}],
+        }],
+    }
+
+
+async def _keepalive_cache(interval: float, idle_timeout: float) -> None:
+    """Periodically re-send the latest cached prefix while analyses keep arriving."""
+    client = _make_client()
+    while time.monotonic() - _last_analysis < idle_timeout:
+        await asyncio.sleep(interval)
+        try:
+            await client.messages.create(**_keepalive_params(_keepalive_prefix))
+        except anthropic.APIError as e:
+            logger.warning("Prompt cache keep-alive request failed: %s", e)
+    logger.info("Prompt cache keep-alive stopped after %.0fs without analyses", idle_timeout)
+
+
+def _touch_keepalive(user_content: list[dict]) -> None:
+    """Record an analysis request and start the keep-alive task if enabled.
+
+    The keep-alive warms the cacheable prefix of the most recent request; if
+    no request so far had one, it does not start.
+    """
+    global _keepalive_task, _last_analysis, _keepalive_prefix, _keepalive_warned
+    _last_analysis = time.monotonic()
+    if PROMPT_CACHE_KEEPALIVE_SECONDS <= 0:
+        return
+    prefix = _cacheable_prefix(user_content)
+    if prefix is not None:
+        _keepalive_prefix = prefix
+    if _keepalive_task is not None and not _keepalive_task.done():
+        return
+    if _keepalive_prefix is None:
+        if not _keepalive_warned:
+            _keepalive_warned = True
+            logger.warning(
+                "PROMPT_CACHE_KEEPALIVE_SECONDS is set, but no prompt prefix has "
+                "reached PROMPT_CACHE_MIN_CHARS (%d chars) yet; not warming",
+                PROMPT_CACHE_MIN_CHARS,
+            )
+        return
+    _keepalive_task = asyncio.get_running_loop().create_task(
+        _keepalive_cache(PROMPT_CACHE_KEEPALIVE_SECONDS, PROMPT_CACHE_KEEPALIVE_IDLE_SECONDS)
     )
 
-    response_text = message.content[0].text
-    logger.info("Received LLM response (%d chars)", len(response_text))
 
-    try:
-        parsed = _parse_llm_response(response_text)
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse LLM response as JSON: %s", e)
-        # Return report with computed metrics even on parse failure
-        return AnalysisReport(
-            proposal=proposal,
-            verdict=verdict,
-            confidence=confidence,
-            executive_summary=f"LLM response could not be parsed. Raw response:\n\n{response_text}",
-            total_results_found=len(similarity_results),
-            results_analyzed=len(similarity_results),
-            search_queries_used=search_queries_used,
-        )
+def _unparsed_report(
+    proposal: UserProposal,
+    similarity_results: list[SimilarityResult],
+    search_queries_used: list[str],
+    verdict: Verdict,
+    confidence: float,
+    response_text: str,
+) -> AnalysisReport:
+    """Report with computed metrics for an LLM response that is not valid JSON."""
+    return AnalysisReport(
+        proposal=proposal,
+        verdict=verdict,
+        confidence=confidence,
+        executive_summary=f"LLM response could not be parsed. Raw response:\n\n{response_text}",
+        total_results_found=len(similarity_results),
+        results_analyzed=len(similarity_results),
+        search_queries_used=search_queries_used,
+    )
 
-    # Build lookup from similarity results for enrichment
-    # Use multiple key formats: exact ID, numeric-only, lowercase title
-    id_lookup: dict[str, SimilarityResult] = {}
-    title_lookup: dict[str, SimilarityResult] = {}
-    for sr in similarity_results:
-        full_id = sr.publication.id.strip()
-        id_lookup[full_id] = sr
-        # Strip "pub." prefix → index by bare numeric ID
-        bare_id = full_id.replace("pub.", "").strip()
-        if bare_id:
-            id_lookup[bare_id] = sr
-        # Case-insensitive, stripped title lookup
-        norm_title = sr.publication.title.strip().lower()
-        if norm_title:
-            title_lookup[norm_title] = sr
 
-    # Build index from similarity results to overlap ratings
-    sr_overlap_map: dict[str, str] = {}
-    for sr, rating in zip(similarity_results, overlap_ratings):
-        sr_overlap_map[sr.publication.id] = rating
+def _no_results_report(
+    proposal: UserProposal,
+    search_queries_used: list[str],
+    verdict: Verdict,
+    confidence: float,
+) -> AnalysisReport:
+    """Report for a topic with no similar publications, built without the LLM."""
+    return AnalysisReport(
+        proposal=proposal,
+        verdict=verdict,
+        confidence=confidence,
+        executive_summary=(
+            f'No publications in the DTIC database were similar enough to "{proposal.title}" '
+            f"to include in the analysis across {len(search_queries_used)} search queries. "
+            "The research landscape for this topic appears open."
+        ),
+        recommendations=[
+            "Confirm the gap with a subject matter expert before committing resources.",
+            "Broaden or rephrase the topic description and keywords to rule out terminology mismatches.",
+        ],
+        search_queries_used=search_queries_used,
+    )
 
-    def _find_sr(pub_id: str, title: str) -> SimilarityResult | None:
+
+class SimilarityIndex:
+    """Lookups for matching LLM-cited publications back to similarity results.
+
+    The LLM may echo an ID with or without the ``pub.`` prefix, or a title
+    that differs in case or was shortened, extended, or re-punctuated. Results
+    are indexed by exact ID, bare numeric ID, lowercase title, and a title
+    prefix; titles missing all of those fall back to a containment scan in
+    result order. Build one per result set and pass it to every analysis of
+    that set.
+    """
+
+    def __init__(self, results: list[SimilarityResult]):
+        self.id_lookup: dict[str, SimilarityResult] = {}
+        self.title_lookup: dict[str, SimilarityResult] = {}
+        self.title_prefix_lookup: dict[str, SimilarityResult] = {}
+        self.titles: list[tuple[str, SimilarityResult]] = []
+        for sr in results:
+            full_id = sr.publication.id.strip()
+            self.id_lookup[full_id] = sr
+            # Strip "pub." prefix → index by bare numeric ID
+            bare_id = full_id.replace("pub.", "").strip()
+            if bare_id:
+                self.id_lookup[bare_id] = sr
+            # Case-insensitive, stripped title lookup
+            norm_title = sr.publication.title.strip().lower()
+            if norm_title:
+                self.title_lookup[norm_title] = sr
+                self.titles.append((norm_title, sr))
+                if len(norm_title) >= _TITLE_PREFIX_LEN:
+                    self.title_prefix_lookup.setdefault(norm_title[:_TITLE_PREFIX_LEN], sr)
+
+    def find(self, pub_id: str, title: str) -> SimilarityResult | None:
         """Find matching SimilarityResult by ID or title."""
+        id_lookup = self.id_lookup
         pid = pub_id.strip()
         # Try exact ID
         if pid in id_lookup:
@@ -190,26 +366,192 @@ async def analyze_uniqueness(
             return id_lookup[f"pub.{bare}"]
         # Fallback: case-insensitive title match
         norm = title.strip().lower()
-        if norm in title_lookup:
-            return title_lookup[norm]
-        # Brute-force: check if any SR ID contains the bare numeric part,
-        # or if titles share substantial overlap
-        for sr in similarity_results:
-            sr_bare = sr.publication.id.replace("pub.", "").strip()
-            if bare and sr_bare and bare == sr_bare:
+        if norm in self.title_lookup:
+            return self.title_lookup[norm]
+        if not norm:
+            return None
+        # Titles sharing a long common prefix (LLM truncated or extended it)
+        if len(norm) >= _TITLE_PREFIX_LEN:
+            sr = self.title_prefix_lookup.get(norm[:_TITLE_PREFIX_LEN])
+            if sr is not None:
                 return sr
-        for sr in similarity_results:
-            sr_title = sr.publication.title.strip().lower()
-            if norm and sr_title and (norm in sr_title or sr_title in norm):
+        # Either title contains the other (shortened, suffixed, punctuated)
+        for sr_title, sr in self.titles:
+            if norm in sr_title or sr_title in norm:
                 return sr
         return None
 
+
+async def analyze_uniqueness(
+    proposal: UserProposal,
+    similarity_results: list[SimilarityResult],
+    search_queries_used: list[str],
+    proposal_embedding: np.ndarray | None = None,
+    sim_index: SimilarityIndex | None = None,
+) -> AnalysisReport:
+    """Send the topic and similar publications to Claude for landscape analysis.
+
+    When ``proposal_embedding`` is given, the parsed LLM response is cached
+    against it and the result set, so a repeat or near-duplicate analysis
+    skips the API call. ``sim_index`` lets callers that analyze the same
+    result set more than once reuse its enrichment lookups.
+    """
+    # Compute deterministic metrics before LLM call
+    overlap_ratings, verdict, confidence = _compute_metrics(proposal, similarity_results)
+
+    if not similarity_results:
+        # Nothing for the LLM to compare against — the deterministic verdict is the answer
+        logger.info("No similar publications; skipping LLM analysis")
+        return _no_results_report(proposal, search_queries_used, verdict, confidence)
+
+    cache = get_analysis_cache() if proposal_embedding is not None else None
+    pub_ids = [r.publication.id for r in similarity_results]
+    branch = proposal.military_branch.value
+
+    # Anything besides the topic and result set that shapes the response
+    variant = f"{LLM_MODEL}|{PROMPT_VERSION}|{proposal.additional_context}"
+
+    parsed = None
+    if cache is not None:
+        parsed = cache.lookup(proposal_embedding, pub_ids, branch, variant)
+        if parsed is not None:
+            logger.info("Using cached LLM analysis for %d results", len(pub_ids))
+
+    if parsed is None:
+        params = _build_request_params(
+            proposal, similarity_results, overlap_ratings, verdict, confidence
+        )
+        _touch_keepalive(params["messages"][0]["content"])
+        response_text = await _request_analysis(params)
+        report, parsed = _report_from_response(
+            proposal, similarity_results, search_queries_used,
+            overlap_ratings, verdict, confidence, response_text, sim_index,
+        )
+        if cache is not None and parsed is not None:
+            cache.store(proposal_embedding, pub_ids, branch, parsed, variant)
+        return report
+
+    return _build_report(
+        proposal, similarity_results, search_queries_used,
+        overlap_ratings, verdict, confidence, parsed, sim_index,
+    )
+
+
+async def _run_batch(requests: list[dict], poll_interval: float) -> dict[str, str]:
+    """Submit a message batch, wait for it to end, and return texts by custom_id."""
+    client = _make_client()
+    batch = await client.messages.batches.create(requests=requests)
+    logger.info("Submitted message batch %s with %d requests", batch.id, len(requests))
+    while batch.processing_status != "ended":
+        await asyncio.sleep(poll_interval)
+        batch = await client.messages.batches.retrieve(batch.id)
+
+    response_texts: dict[str, str] = {}
+    async for entry in await client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            message = entry.result.message
+            response_texts[entry.custom_id] = message.content[0].text
+            _log_response(response_texts[entry.custom_id], message.usage)
+        else:
+            logger.warning("Batch request %s %s", entry.custom_id, entry.result.type)
+    return response_texts
+
+
+async def analyze_uniqueness_batch(
+    analyses: list[tuple[UserProposal, list[SimilarityResult], list[str]]],
+    poll_interval: float = LLM_BATCH_POLL_SECONDS,
+) -> list[AnalysisReport]:
+    """Analyze several topics through the Message Batches API.
+
+    Each entry is ``(proposal, similarity_results, search_queries_used)``.
+    Batches are billed at half the price of individual calls but may take
+    minutes to complete, so this suits sweeps and backfills rather than
+    interactive use. Reports are returned in input order; entries the batch
+    fails to process are retried individually.
+    """
+    if len(analyses) <= 1:
+        return [await analyze_uniqueness(*a) for a in analyses]
+
+    metrics = [_compute_metrics(proposal, results) for proposal, results, _ in analyses]
+    # Topics without results are answered without the LLM below
+    requests = [
+        {
+            "custom_id": f"analysis-{i}",
+            "params": _build_request_params(proposal, results, *metrics[i]),
+        }
+        for i, (proposal, results, _) in enumerate(analyses)
+        if results
+    ]
+    response_texts = await _run_batch(requests, poll_interval) if requests else {}
+
+    reports = []
+    for i, (proposal, results, queries) in enumerate(analyses):
+        response_text = response_texts.get(f"analysis-{i}")
+        if response_text is None:
+            reports.append(await analyze_uniqueness(proposal, results, queries))
+            continue
+        report, _ = _report_from_response(
+            proposal, results, queries, *metrics[i], response_text,
+        )
+        reports.append(report)
+    return reports
+
+
+def _report_from_response(
+    proposal: UserProposal,
+    similarity_results: list[SimilarityResult],
+    search_queries_used: list[str],
+    overlap_ratings: list[str],
+    verdict: Verdict,
+    confidence: float,
+    response_text: str,
+    sim_index: SimilarityIndex | None = None,
+) -> tuple[AnalysisReport, dict | None]:
+    """Parse an LLM response and build its report.
+
+    Returns the report and the parsed payload, which is None when the
+    response was not valid JSON.
+    """
+    try:
+        parsed = _parse_llm_response(response_text)
+    except orjson.JSONDecodeError as e:
+        logger.error("Failed to parse LLM response as JSON: %s", e)
+        # Return report with computed metrics even on parse failure
+        return _unparsed_report(
+            proposal, similarity_results, search_queries_used,
+            verdict, confidence, response_text,
+        ), None
+    return _build_report(
+        proposal, similarity_results, search_queries_used,
+        overlap_ratings, verdict, confidence, parsed, sim_index,
+    ), parsed
+
+
+def _build_report(
+    proposal: UserProposal,
+    similarity_results: list[SimilarityResult],
+    search_queries_used: list[str],
+    overlap_ratings: list[str],
+    verdict: Verdict,
+    confidence: float,
+    parsed: dict,
+    sim_index: SimilarityIndex | None = None,
+) -> AnalysisReport:
+    """Enrich the parsed LLM response with scores and metadata from the results."""
+    if sim_index is None:
+        sim_index = SimilarityIndex(similarity_results)
+
+    # Build index from similarity results to overlap ratings
+    sr_overlap_map: dict[str, str] = {}
+    for sr, rating in zip(similarity_results, overlap_ratings):
+        sr_overlap_map[sr.publication.id] = rating
+
     # Build comparisons — use computed overlap_rating instead of LLM's
     comparisons = []
     for comp_data in parsed.get("comparisons", []):
         pub_id = comp_data.get("publication_id", "")
         comp_title = comp_data.get("title", "")
-        sr = _find_sr(pub_id, comp_title)
+        sr = sim_index.find(pub_id, comp_title)
         pub = sr.publication if sr else None
 
         if sr:
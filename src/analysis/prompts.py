@@ -1,26 +1,45 @@
 """Prompt templates for LLM landscape analysis."""
 
+import hashlib
+from pathlib import Path
+
+from src.models import SimilarityResult
+
 SYSTEM_PROMPT = """\
-You are an expert research analyst specializing in defense research landscape assessment. \
-Your task is to analyze the existing publication landscape in the Defense Technical Information \
-Center (DTIC) database for a given research topic, identifying coverage patterns, gaps, and \
-opportunities.
+You are an expert defense research analyst. Assess the existing publication landscape in the \
+Defense Technical Information Center (DTIC) database for a research topic: coverage, gaps, \
+and opportunities.
+
+Landscape categories:
+- UNIQUE: no substantially similar DTIC work; wide opportunity for new research.
+- NAVY_UNIQUE: related work exists but was funded by other branches (Army, Air Force, \
+DARPA, etc.), not the branch of interest; a possible investment opportunity for it.
+- AT_RISK: already well covered, regardless of funding branch.
+- NEEDS_REVIEW: ambiguous; partial overlaps need human expert judgment.
+
+Be thorough but fair: papers can share a broad area yet pursue different questions, methods, \
+or applications. Judge substantive relevance, not keyword matches."""
+
 
-You must provide a structured assessment with one of four landscape categories:
+ANALYSIS_INSTRUCTIONS = """\
+Analyze the research topic against the DTIC publications below. Reply with JSON only \
+(no markdown fences) in this shape:
 
-- **UNIQUE**: Open landscape — no substantially similar work exists in the DTIC database. \
-The topic area has wide opportunity for new research.
-- **NAVY_UNIQUE**: Branch opportunity — related work exists in DTIC but was funded by \
-other military branches (Army, Air Force, DARPA, etc.) — not by the branch of interest. \
-There may be an opportunity for the specified branch to invest in this area.
-- **AT_RISK**: Well covered — the topic area is already well covered in the existing \
-research landscape, regardless of which branch funded the work.
-- **NEEDS_REVIEW**: Mixed coverage — the evidence is ambiguous. There are partial overlaps \
-that require human expert judgment to fully assess the landscape.
+{"executive_summary":"2-3 paragraphs on the landscape and gaps",\
+"comparisons":[{"publication_id":"pub id","title":"pub title",\
+"similarity_assessment":"1-2 sentences on how it relates to the topic",\
+"key_differences":["..."],"key_overlaps":["..."]}],\
+"points_of_differentiation":["3-5 gaps or opportunities"],\
+"recommendations":["2-4 actionable recommendations"],\
+"branch_relevance":{"determination":"branch_specific or cross_branch",\
+"reasoning":"1-2 sentences"}}
 
-Be thorough but fair. Consider that two papers can share a broad topic area while pursuing \
-genuinely different research questions, methods, or applications. Focus on substantive \
-relevance, not superficial keyword matches."""
+For branch_relevance, weigh both sides: is the topic inherently tied to the branch's mission, \
+platforms, or facilities (e.g. Navy shipyard maintenance), or a universal defense problem \
+(e.g. an ML architecture for predictive maintenance)?
+
+Evaluate EVERY publication listed. Be specific about relevance and gaps, and consider the \
+branch of interest for branch opportunity determinations."""
 
 
 def build_analysis_prompt(
@@ -31,25 +50,35 @@ def build_analysis_prompt(
     additional_context: str,
     publications_text: str,
     precomputed_metrics: str = "",
-) -> str:
-    """Build the user prompt for landscape analysis."""
+) -> tuple[str, str]:
+    """Build the user prompt for landscape analysis.
+
+    Returns ``(cacheable_prefix, variable_suffix)``. The prefix holds the
+    publications block, which is identical across retries and revisions of
+    the same result set; the suffix holds the topic-specific fields. Callers
+    send ``ANALYSIS_INSTRUCTIONS`` ahead of both so the static scaffolding
+    forms the start of the prompt cache.
+    """
     keywords_str = ", ".join(proposal_keywords) if proposal_keywords else "None provided"
 
     metrics_section = ""
     if precomputed_metrics:
         metrics_section = f"""
----
-
 ## Pre-Computed Metrics
 
-The following landscape assessment, confidence, and per-publication relevance ratings have \
-been computed deterministically from the cosine similarity scores. Reference these in your \
-narrative text — do NOT override them.
+Computed deterministically from cosine similarity. Reference them in your narrative; \
+do NOT override them.
 
 {precomputed_metrics}
 """
 
-    return f"""\
+    cacheable_prefix = f"""\
+## Existing DTIC Publications
+
+{publications_text}
+"""
+
+    variable_suffix = f"""\
 ## Research Topic Under Analysis
 
 **Title:** {proposal_title}
@@ -57,73 +86,49 @@ narrative text — do NOT override them.
 **Keywords:** {keywords_str}
 **Branch of Interest:** {proposal_branch}
 **Research Focus:** {additional_context or "None provided"}
+{metrics_section}"""
 
----
+    return cacheable_prefix, variable_suffix
 
-## Existing DTIC Publications
 
-{publications_text}
-{metrics_section}
----
-
-## Instructions
-
-Analyze the research topic against the publications above and provide your landscape \
-assessment in the following JSON format. Do NOT wrap in markdown code fences.
-
-Additionally, assess whether this research topic is inherently specific to the branch of \
-interest's mission, platforms, or facilities (e.g., Navy shipyard maintenance is inherently \
-Navy-specific), or whether it represents a universal defense problem applicable across \
-branches (e.g., a novel ML architecture for predictive maintenance could serve any branch). \
-Consider arguments for both sides before making your determination.
-
-{{
-  "executive_summary": "2-3 paragraph summary of the research landscape and gap analysis",
-  "comparisons": [
-    {{
-      "publication_id": "pub id",
-      "title": "pub title",
-      "similarity_assessment": "1-2 sentence description of how this pub relates to the topic",
-      "key_differences": ["difference 1", "difference 2"],
-      "key_overlaps": ["overlap 1", "overlap 2"]
-    }}
-  ],
-  "points_of_differentiation": [
-    "Identified gaps and opportunities in the existing landscape (list 3-5 points)"
-  ],
-  "recommendations": [
-    "Actionable recommendations for pursuing research in this area (list 2-4 points)"
-  ],
-  "branch_relevance": {{
-    "determination": "branch_specific or cross_branch",
-    "reasoning": "1-2 sentences explaining why this topic is or is not inherently tied to the branch of interest"
-  }}
-}}
-
-Evaluate EVERY publication listed above. Be specific about relevance and gaps. \
-Consider the branch of interest for branch opportunity determinations."""
+_PUB_TEMPLATE = (
+    "### Publication {i} (Similarity: {similarity_score:.3f})\n"
+    "- **ID:** {id}\n"
+    "- **Title:** {title}\n"
+    "- **Year:** {pub_year}\n"
+    "- **Authors:** {authors}\n"
+    "- **Journal:** {journal_title}\n"
+    "- **Funding Branches:** {branches}\n"
+    "- **Times Cited:** {times_cited}\n"
+    "- **Abstract:** {abstract}\n"
+)
 
 
 def format_publications_for_prompt(
-    publications: list[dict],
+    results: list[SimilarityResult],
 ) -> str:
     """Format ranked publications into text for the LLM prompt."""
-    if not publications:
+    if not results:
         return "No similar publications were found in the DTIC database."
 
     parts = []
-    for i, pub in enumerate(publications, 1):
-        branches = ", ".join(pub.get("detected_branches", [])) or "Unknown"
-        abstract = pub.get("abstract", "No abstract available")
-        parts.append(
-            f"### Publication {i} (Similarity: {pub['similarity_score']:.3f})\n"
-            f"- **ID:** {pub['id']}\n"
-            f"- **Title:** {pub['title']}\n"
-            f"- **Year:** {pub.get('pub_year', 'Unknown')}\n"
-            f"- **Authors:** {pub.get('authors', 'Unknown')}\n"
-            f"- **Journal:** {pub.get('journal_title', 'Unknown')}\n"
-            f"- **Funding Branches:** {branches}\n"
-            f"- **Times Cited:** {pub.get('times_cited', 0)}\n"
-            f"- **Abstract:** {abstract}\n"
-        )
+    for i, r in enumerate(results, 1):
+        pub = r.publication
+        parts.append(_PUB_TEMPLATE.format(
+            i=i,
+            similarity_score=r.similarity_score,
+            id=pub.id,
+            title=pub.title,
+            pub_year=pub.pub_year if pub.pub_year is not None else "Unknown",
+            authors=", ".join(pub.authors) or "Unknown",
+            journal_title=pub.journal_title,
+            branches=", ".join(b.value for b in pub.detected_branches) or "Unknown",
+            times_cited=pub.times_cited,
+            abstract=pub.best_abstract,
+        ))
     return "\n".join(parts)
+
+
+# Fingerprint of every template in this module; cached analyses are keyed on
+# it so that editing a prompt invalidates them
+PROMPT_VERSION = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
@@ -2,24 +2,99 @@
 
 from __future__ import annotations
 
+import functools
+import io
 import re
 from datetime import datetime, timezone
+from string import Template
+from typing import NamedTuple
+
+from src.models import AnalysisReport, MilitaryBranch, Verdict
+
+
+class _VerdictMeta(NamedTuple):
+    badge: str
+    description: str
+
+
+_VERDICT_META = {
+    Verdict.UNIQUE: _VerdictMeta(
+        "OPEN LANDSCAPE",
+        "No substantially similar work was found. This topic area has wide opportunity for new research.",
+    ),
+    Verdict.NAVY_UNIQUE: _VerdictMeta(
+        "BRANCH OPPORTUNITY",
+        "Related work exists in other branches but not the branch of interest. There may be an opportunity to invest in this area.",
+    ),
+    Verdict.AT_RISK: _VerdictMeta(
+        "WELL COVERED",
+        "This topic area is already well covered in the existing research landscape.",
+    ),
+    Verdict.NEEDS_REVIEW: _VerdictMeta(
+        "MIXED COVERAGE",
+        "Mixed coverage found — partial overlaps that require human expert judgment to fully assess.",
+    ),
+}
 
-from src.models import AnalysisReport, Verdict
+VERDICT_BADGES = {v: m.badge for v, m in _VERDICT_META.items()}
+VERDICT_DESCRIPTIONS = {v: m.description for v, m in _VERDICT_META.items()}
 
-VERDICT_BADGES = {
-    Verdict.UNIQUE: "OPEN LANDSCAPE",
-    Verdict.NAVY_UNIQUE: "BRANCH OPPORTUNITY",
-    Verdict.AT_RISK: "WELL COVERED",
-    Verdict.NEEDS_REVIEW: "MIXED COVERAGE",
-}
+_UTC = timezone.utc
 
-VERDICT_DESCRIPTIONS = {
-    Verdict.UNIQUE: "No substantially similar work was found. This topic area has wide opportunity for new research.",
-    Verdict.NAVY_UNIQUE: "Related work exists in other branches but not the branch of interest. There may be an opportunity to invest in this area.",
-    Verdict.AT_RISK: "This topic area is already well covered in the existing research landscape.",
-    Verdict.NEEDS_REVIEW: "Mixed coverage found — partial overlaps that require human expert judgment to fully assess.",
-}
+_OVERLAP_INDICATORS = {"low": "Low", "medium": "Medium", "high": "HIGH"}
+
+# Fixed report scaffolding; only the optional sections are built per call
+_REPORT_HEADER = Template("""\
+# Uncharted Waters Explorer — Research Landscape Report
+
+**Generated:** $generated
+
+---
+
+## Landscape Assessment: $badge
+
+**Confidence:** $confidence
+
+""")
+
+_REPORT_TOPIC = Template("""\
+> $desc
+
+---
+
+## Topic Summary
+
+**Title:** $title
+
+**Branch of Interest:** $branch
+
+**Topic Description:** $topic
+
+""")
+
+_REPORT_SUMMARY = Template("""\
+---
+
+## Executive Summary
+
+$exec_summary
+
+---
+
+## Search Statistics
+
+- **Queries Used:** $num_queries
+- **Total Publications Found:** $total_found
+- **Publications Analyzed (Top Matches):** $analyzed
+
+""")
+
+_REPORT_FOOTER = (
+    "---\n\n"
+    "*This report was generated automatically by Uncharted Waters Explorer. "
+    "It is intended to assist with research landscape exploration and should be "
+    "reviewed by a subject matter expert.*"
+)
 
 
 _BRANCH_DISPLAY = {
@@ -31,11 +106,21 @@ _BRANCH_DISPLAY = {
     "marine_corps": "Marine Corps",
     "space_force": "Space Force",
 }
+# Cover every enum value so lookups for known branches never hit the fallback
+for _branch in MilitaryBranch:
+    _BRANCH_DISPLAY.setdefault(_branch.value, _branch.value.replace("_", " ").title())
+del _branch
 
 
 def _format_branch(branch: str) -> str:
     """Format a branch value for display, handling acronyms correctly."""
-    return _BRANCH_DISPLAY.get(branch, branch.replace("_", " ").title())
+    label = _BRANCH_DISPLAY.get(branch)
+    # Only build the title-cased fallback for branches without a display name
+    return label if label is not None else branch.replace("_", " ").title()
+
+
+# A newline between two non-blank lines, neither of which is a "-" list item
+_PARAGRAPH_JOIN = re.compile(r"(?m)^([^\S\n]*[^\s-][^\n]*)\n(?=[^\S\n]*[^\s-])")
 
 
 def _ensure_paragraph_breaks(text: str) -> str:
@@ -43,30 +128,23 @@ def _ensure_paragraph_breaks(text: str) -> str:
 
     CommonMark treats single \\n as a soft break (space), so LLM output
     that uses single newlines between paragraphs renders as one blob.
+    Lines that are blank or start with "-" (list items) are left as is.
     """
-    lines = text.split("\n")
-    result: list[str] = []
-    for i, line in enumerate(lines):
-        result.append(line)
-        # If this line and the next are both non-empty, insert an extra blank line
-        if (
-            i < len(lines) - 1
-            and line.strip()
-            and lines[i + 1].strip()
-            # Don't double-break if there's already a blank line
-            and not line.strip().startswith("-")
-            and not lines[i + 1].strip().startswith("-")
-        ):
-            result.append("")
-    return "\n".join(result)
+    return _PARAGRAPH_JOIN.sub(r"\1\n\n", text)
+
+
+_SLUG_NONWORD = re.compile(r"[^\w\s-]")
+_SLUG_SPACE = re.compile(r"[\s_]+")
+_SLUG_DASH = re.compile(r"-+")
 
 
+@functools.lru_cache(maxsize=1024)
 def _slugify(text: str) -> str:
     """Create a URL-safe anchor slug from a title."""
     slug = text.lower().strip()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_]+", "-", slug)
-    slug = re.sub(r"-+", "-", slug)
+    slug = _SLUG_NONWORD.sub("", slug)
+    slug = _SLUG_SPACE.sub("-", slug)
+    slug = _SLUG_DASH.sub("-", slug)
     return slug.strip("-")
 
 
@@ -76,115 +154,99 @@ def _add_executive_summary_links(
 ) -> str:
     """Find exact title matches in the executive summary and wrap them as anchor links.
 
-    Sorts by title length descending to avoid substring conflicts.
+    Links the first occurrence of each title in a single left-to-right pass;
+    where titles overlap, the longest one starting at a position wins, so
+    "Foo Bar Baz" is matched before "Foo Bar". Titles already written as
+    ``[title]`` in the summary are left alone.
     """
-    # Sort longest first so "Foo Bar Baz" is matched before "Foo Bar"
-    pairs = sorted(title_slug_pairs, key=lambda p: len(p[0]), reverse=True)
-    for title, slug in pairs:
-        # Only link the first occurrence, avoid double-linking
-        if title in summary_text and f"[{title}]" not in summary_text:
-            summary_text = summary_text.replace(
-                title, f"[{title}](#{slug})", 1
-            )
-    return summary_text
+    slugs = {
+        title: slug for title, slug in title_slug_pairs
+        if title and f"[{title}]" not in summary_text
+    }
+    if not slugs:
+        return summary_text
+
+    # Longest first so the alternation prefers the longer of overlapping titles
+    pattern = re.compile("|".join(
+        re.escape(title) for title in sorted(slugs, key=len, reverse=True)
+    ))
+
+    def _link(match: re.Match) -> str:
+        title = match.group(0)
+        slug = slugs.pop(title, None)  # Only link the first occurrence
+        return title if slug is None else f"[{title}](#{slug})"
+
+    return pattern.sub(_link, summary_text)
+
+
+def _bullets(items: list[str]) -> str:
+    """Render items as a Markdown bullet list, one line each."""
+    return "".join(f"- {item}\n" for item in items)
 
 
 def generate_markdown_report(report: AnalysisReport) -> str:
     """Generate a full Markdown report from the analysis results."""
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    badge = VERDICT_BADGES[report.verdict]
-    desc = VERDICT_DESCRIPTIONS[report.verdict]
+    dt = datetime.now(_UTC)
+    now = f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d} UTC"
+    badge, desc = _VERDICT_META[report.verdict]
 
-    # Pre-compute title/slug pairs for anchor linking
-    title_slug_pairs = [
-        (comp.title, _slugify(comp.title)) for comp in report.comparisons
-    ]
+    # Slug each title once; reused for anchors and executive summary links
+    title_to_slug = {comp.title: _slugify(comp.title) for comp in report.comparisons}
 
     # Process executive summary: paragraph breaks + anchor links
     exec_summary = _ensure_paragraph_breaks(report.executive_summary)
-    exec_summary = _add_executive_summary_links(exec_summary, title_slug_pairs)
+    exec_summary = _add_executive_summary_links(exec_summary, list(title_to_slug.items()))
 
     topic_text = report.proposal.topic_description or report.proposal.abstract
 
-    lines = [
-        f"# Uncharted Waters Explorer — Research Landscape Report",
-        f"",
-        f"**Generated:** {now}",
-        f"",
-        f"---",
-        f"",
-        f"## Landscape Assessment: {badge}",
-        f"",
-        f"**Confidence:** {report.confidence:.0%}",
-        f"",
-    ]
+    subs = {
+        "generated": now,
+        "badge": badge,
+        "confidence": f"{report.confidence:.0%}",
+        "desc": desc,
+        "title": report.proposal.title,
+        "branch": report.proposal.military_branch.value,
+        "topic": topic_text,
+        "exec_summary": exec_summary,
+        "num_queries": len(report.search_queries_used),
+        "total_found": report.total_results_found,
+        "analyzed": report.results_analyzed,
+    }
+
+    buf = io.StringIO()
+    w = buf.write
+    w(_REPORT_HEADER.substitute(subs))
 
     if report.branch_relevance:
         rel_label = "Cross-Branch Applicable"
         if report.branch_relevance == "branch_specific":
             branch_name = _format_branch(report.proposal.military_branch.value)
             rel_label = f"Branch-Specific to {branch_name}"
-        lines.append(f"**Branch Relevance:** {rel_label}")
+        w(f"**Branch Relevance:** {rel_label}\n")
         if report.branch_relevance_reasoning:
-            lines.append(f"")
-            lines.append(f"> {report.branch_relevance_reasoning}")
-        lines.append("")
-
-    lines.extend([
-        f"> {desc}",
-        f"",
-        f"---",
-        f"",
-        f"## Topic Summary",
-        f"",
-        f"**Title:** {report.proposal.title}",
-        f"",
-        f"**Branch of Interest:** {report.proposal.military_branch.value}",
-        f"",
-        f"**Topic Description:** {topic_text}",
-        f"",
-    ])
+            w(f"\n> {report.branch_relevance_reasoning}\n")
+        w("\n")
+
+    w(_REPORT_TOPIC.substitute(subs))
 
     if report.proposal.keywords:
-        lines.append(f"**Keywords:** {', '.join(report.proposal.keywords)}")
-        lines.append("")
-
-    lines.extend([
-        f"---",
-        f"",
-        f"## Executive Summary",
-        f"",
-        f"{exec_summary}",
-        f"",
-        f"---",
-        f"",
-        f"## Search Statistics",
-        f"",
-        f"- **Queries Used:** {len(report.search_queries_used)}",
-        f"- **Total Publications Found:** {report.total_results_found}",
-        f"- **Publications Analyzed (Top Matches):** {report.results_analyzed}",
-        f"",
-    ])
+        w(f"**Keywords:** {', '.join(report.proposal.keywords)}\n\n")
+
+    w(_REPORT_SUMMARY.substitute(subs))
 
     if report.search_queries_used:
-        lines.append("### Search Queries")
-        lines.append("")
-        for i, q in enumerate(report.search_queries_used, 1):
-            lines.append(f"{i}. {q}")
-        lines.append("")
+        w("### Search Queries\n\n")
+        w("".join(f"{i}. {q}\n" for i, q in enumerate(report.search_queries_used, 1)))
+        w("\n")
 
     if report.comparisons:
-        lines.extend([
-            f"---",
-            f"",
-            f"## Publication Analysis",
-            f"",
-        ])
+        w("---\n\n## Publication Analysis\n\n")
+        format_branch = _format_branch
         for comp in report.comparisons:
-            overlap_indicator = {"low": "Low", "medium": "Medium", "high": "HIGH"}.get(
+            overlap_indicator = _OVERLAP_INDICATORS.get(
                 comp.overlap_rating, comp.overlap_rating
             )
-            slug = _slugify(comp.title)
+            slug = title_to_slug[comp.title]
             assessment = _ensure_paragraph_breaks(comp.similarity_assessment)
 
             # Title as hyperlink if URL is available, otherwise plain text
@@ -197,114 +259,77 @@ def generate_markdown_report(report: AnalysisReport) -> str:
                 f"[{comp.publication_id}]({comp.url})"
                 if comp.url else comp.publication_id
             )
-            meta_parts = [f"**ID:** {id_display}"]
-            if comp.pub_year:
-                meta_parts.append(f"**Year:** {comp.pub_year}")
-            if comp.funding_branches:
-                branches_str = ", ".join(
-                    _format_branch(b) for b in comp.funding_branches
-                )
-                meta_parts.append(f"**Funding:** {branches_str}")
-            meta_parts.append(f"**Overlap Rating:** {overlap_indicator}")
-            if comp.similarity_score > 0:
-                meta_parts.append(f"**Similarity:** {comp.similarity_score:.3f}")
-            meta_line = " | ".join(meta_parts)
-
-            lines.extend([
-                f'<a id="{slug}"></a>',
-                f"",
-                f"### {title_display}",
-                f"",
-                f"{meta_line}",
-                f"",
-                f"{assessment}",
-                f"",
-            ])
+            year_md = f" | **Year:** {comp.pub_year}" if comp.pub_year else ""
+            funding_md = (
+                f" | **Funding:** {', '.join(map(format_branch, comp.funding_branches))}"
+                if comp.funding_branches else ""
+            )
+            sim_md = (
+                f" | **Similarity:** {comp.similarity_score:.3f}"
+                if comp.similarity_score > 0 else ""
+            )
+            meta_line = (
+                f"**ID:** {id_display}{year_md}{funding_md}"
+                f" | **Overlap Rating:** {overlap_indicator}{sim_md}"
+            )
+
+            w(
+                f'<a id="{slug}"></a>\n\n'
+                f"### {title_display}\n\n"
+                f"{meta_line}\n\n"
+                f"{assessment}\n\n"
+            )
             if comp.key_overlaps:
-                lines.append("**Key Overlaps:**")
-                for overlap in comp.key_overlaps:
-                    lines.append(f"- {overlap}")
-                lines.append("")
+                w(f"**Key Overlaps:**\n{_bullets(comp.key_overlaps)}\n")
             if comp.key_differences:
-                lines.append("**Key Differences:**")
-                for diff in comp.key_differences:
-                    lines.append(f"- {diff}")
-                lines.append("")
+                w(f"**Key Differences:**\n{_bullets(comp.key_differences)}\n")
 
     if report.points_of_differentiation:
-        lines.extend([
-            f"---",
-            f"",
-            f"## Identified Gaps & Opportunities",
-            f"",
-        ])
-        for point in report.points_of_differentiation:
-            lines.append(f"- {point}")
-        lines.append("")
+        w("---\n\n## Identified Gaps & Opportunities\n\n")
+        w(f"{_bullets(report.points_of_differentiation)}\n")
 
     if report.recommendations:
-        lines.extend([
-            f"---",
-            f"",
-            f"## Recommendations",
-            f"",
-        ])
-        for rec in report.recommendations:
-            lines.append(f"- {rec}")
-        lines.append("")
-
-    lines.extend([
-        f"---",
-        f"",
-        f"*This report was generated automatically by Uncharted Waters Explorer. "
-        f"It is intended to assist with research landscape exploration and should be "
-        f"reviewed by a subject matter expert.*",
-    ])
-
-    return "\n".join(lines)
+        w("---\n\n## Recommendations\n\n")
+        w(f"{_bullets(report.recommendations)}\n")
+
+    w(_REPORT_FOOTER)
+
+    return buf.getvalue()
 
 
 def generate_step_summary(report: AnalysisReport) -> str:
     """Generate a shorter summary for GitHub Actions step summary."""
-    badge = VERDICT_BADGES[report.verdict]
+    badge = _VERDICT_META[report.verdict].badge
     exec_summary = _ensure_paragraph_breaks(report.executive_summary)
 
-    lines = [
-        f"## Landscape Assessment: {badge}",
-        f"",
-        f"**Topic:** {report.proposal.title}",
-        f"",
-        f"**Confidence:** {report.confidence:.0%}",
-        f"",
-    ]
+    buf = io.StringIO()
+    w = buf.write
+    w(
+        f"## Landscape Assessment: {badge}\n\n"
+        f"**Topic:** {report.proposal.title}\n\n"
+        f"**Confidence:** {report.confidence:.0%}\n\n"
+    )
 
     if report.branch_relevance:
         rel_label = "Cross-Branch Applicable"
         if report.branch_relevance == "branch_specific":
             branch_name = _format_branch(report.proposal.military_branch.value)
             rel_label = f"Branch-Specific to {branch_name}"
-        lines.append(f"**Branch Relevance:** {rel_label}")
+        w(f"**Branch Relevance:** {rel_label}\n")
         if report.branch_relevance_reasoning:
-            lines.append(f"> {report.branch_relevance_reasoning}")
-        lines.append("")
+            w(f"> {report.branch_relevance_reasoning}\n")
+        w("\n")
 
-    lines.extend([
+    w(
         f"**Publications Found:** {report.total_results_found} | "
-        f"**Analyzed:** {report.results_analyzed}",
-        f"",
-        f"### Summary",
-        f"",
-        f"{exec_summary}",
-        f"",
-    ])
+        f"**Analyzed:** {report.results_analyzed}\n\n"
+        f"### Summary\n\n"
+        f"{exec_summary}\n\n"
+    )
 
     if report.recommendations:
-        lines.append("### Key Recommendations")
-        lines.append("")
-        for rec in report.recommendations:
-            lines.append(f"- {rec}")
-        lines.append("")
+        w(f"### Key Recommendations\n\n{_bullets(report.recommendations)}\n")
 
-    lines.append("*Full report available as workflow artifact.*")
+    w("*Full report available as workflow artifact.*")
 
-    return "\n".join(lines)
+    return buf.getvalue()
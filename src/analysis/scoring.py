@@ -9,23 +9,42 @@ AT_RISK = well covered, NEEDS_REVIEW = mixed coverage.
 
 from __future__ import annotations
 
+from collections import Counter
+
+import numpy as np
+
 from src.config import OVERLAP_HIGH_THRESHOLD, OVERLAP_MEDIUM_THRESHOLD
 from src.models import MilitaryBranch, SimilarityResult, Verdict
 
 
-def compute_overlap_rating(similarity_score: float) -> str:
+def compute_overlap_rating(
+    similarity_score: float,
+    _high: float = OVERLAP_HIGH_THRESHOLD,
+    _medium: float = OVERLAP_MEDIUM_THRESHOLD,
+) -> str:
     """Map a cosine similarity score to a categorical overlap rating.
 
     Thresholds are calibrated for embedding cosine similarity where
-    the inclusion floor is already 0.30.
+    the inclusion floor is already 0.30. The underscore parameters bind
+    the thresholds as locals and are not meant to be passed.
     """
-    if similarity_score >= OVERLAP_HIGH_THRESHOLD:
+    if similarity_score >= _high:
         return "high"
-    if similarity_score >= OVERLAP_MEDIUM_THRESHOLD:
+    if similarity_score >= _medium:
         return "medium"
     return "low"
 
 
+_OVERLAP_LABELS = ("low", "medium", "high")
+
+
+def _overlap_codes(scores: np.ndarray) -> np.ndarray:
+    """Bucket scores into 0/1/2 codes indexing ``_OVERLAP_LABELS``."""
+    codes = (scores >= OVERLAP_MEDIUM_THRESHOLD).astype(np.int8)
+    codes += scores >= OVERLAP_HIGH_THRESHOLD
+    return codes
+
+
 def compute_verdict(
     results: list[SimilarityResult],
     overlap_ratings: list[str],
@@ -42,21 +61,18 @@ def compute_verdict(
     if not results:
         return Verdict.UNIQUE
 
-    high_indices = [i for i, r in enumerate(overlap_ratings) if r == "high"]
-    medium_indices = [i for i, r in enumerate(overlap_ratings) if r == "medium"]
-
-    def _any_shares_branch(indices: list[int]) -> bool:
-        for i in indices:
-            pub_branches = [b.value for b in results[i].publication.detected_branches]
-            if proposal_branch in pub_branches:
-                return True
-        return False
-
-    if high_indices:
-        return Verdict.AT_RISK
-
-    if medium_indices:
-        if _any_shares_branch(medium_indices):
+    has_medium = False
+    medium_shares_branch = False
+    for r, rating in zip(results, overlap_ratings):
+        if rating == "high":
+            return Verdict.AT_RISK
+        if rating == "medium":
+            has_medium = True
+            if not medium_shares_branch:
+                medium_shares_branch = proposal_branch in r.publication.branch_values
+
+    if has_medium:
+        if medium_shares_branch:
             return Verdict.NEEDS_REVIEW
         return Verdict.NAVY_UNIQUE
 
@@ -76,22 +92,37 @@ def compute_confidence(
         return 0.90  # No results → high confidence in UNIQUE
 
     max_score = max(r.similarity_score for r in results)
-    n_high = sum(1 for r in overlap_ratings if r == "high")
-    n_medium = sum(1 for r in overlap_ratings if r == "medium")
+    counts = Counter(overlap_ratings)
+    return _confidence_from_stats(
+        verdict, max_score, counts["high"], counts["medium"], len(results)
+    )
+
 
-    if verdict == Verdict.UNIQUE:
+def _confidence_from_stats(
+    verdict: Verdict,
+    max_score: float,
+    n_high: int,
+    n_medium: int,
+    n_results: int,
+    _medium: float = OVERLAP_MEDIUM_THRESHOLD,
+    _unique: Verdict = Verdict.UNIQUE,
+    _at_risk: Verdict = Verdict.AT_RISK,
+    _navy_unique: Verdict = Verdict.NAVY_UNIQUE,
+) -> float:
+    """Confidence formula shared by :func:`compute_confidence` and :func:`score_all`."""
+    if verdict == _unique:
         # Higher confidence when max score is far below medium threshold
-        gap = OVERLAP_MEDIUM_THRESHOLD - max_score
+        gap = _medium - max_score
         # gap ranges from ~0.15 (score=0.30) to ~0.45 (score=0.0)
         # Map to 0.60–0.95
-        base = 0.60 + min(gap / OVERLAP_MEDIUM_THRESHOLD, 1.0) * 0.35
+        base = 0.60 + min(gap / _medium, 1.0) * 0.35
 
-    elif verdict == Verdict.AT_RISK:
+    elif verdict == _at_risk:
         # More high-overlap results → higher confidence in AT_RISK
         # 1 high → 0.60, caps around 0.90 at 5+
         base = 0.60 + min(n_high / 5.0, 1.0) * 0.30
 
-    elif verdict == Verdict.NAVY_UNIQUE:
+    elif verdict == _navy_unique:
         # Moderate base, scaled by clarity of overlap signals
         overlap_count = n_high + n_medium
         base = 0.65 + min(overlap_count / 8.0, 1.0) * 0.20
@@ -101,8 +132,46 @@ def compute_confidence(
         base = 0.45 + min(n_medium / 6.0, 1.0) * 0.15
 
     # Sample size bonus: +0–5% based on result count (caps at 15)
-    sample_bonus = min(len(results) / 15.0, 1.0) * 0.05
+    sample_bonus = min(n_results / 15.0, 1.0) * 0.05
 
     confidence = base + sample_bonus
     confidence = round(max(0.10, min(0.99, confidence)), 2)
     return confidence
+
+
+def score_all(
+    results: list[SimilarityResult],
+    proposal_branch: str,
+) -> tuple[list[str], Verdict, float]:
+    """Compute overlap ratings, verdict, and confidence in one pass over the scores.
+
+    Equivalent to mapping :func:`compute_overlap_rating` over the results and
+    calling :func:`compute_verdict` and :func:`compute_confidence`, but the
+    scores are bucketed, counted, and maximized once as a NumPy array.
+    """
+    if not results:
+        return [], Verdict.UNIQUE, compute_confidence([], [], Verdict.UNIQUE)
+
+    scores = np.fromiter(
+        (r.similarity_score for r in results), dtype=np.float64, count=len(results)
+    )
+    codes = _overlap_codes(scores)
+    _, n_medium, n_high = np.bincount(codes, minlength=3).tolist()
+
+    if n_high:
+        verdict = Verdict.AT_RISK
+    elif n_medium:
+        shares_branch = any(
+            proposal_branch in results[i].publication.branch_values
+            for i in np.flatnonzero(codes == 1).tolist()
+        )
+        verdict = Verdict.NEEDS_REVIEW if shares_branch else Verdict.NAVY_UNIQUE
+    else:
+        verdict = Verdict.UNIQUE
+
+    labels = _OVERLAP_LABELS
+    ratings = [labels[c] for c in codes.tolist()]
+    confidence = _confidence_from_stats(
+        verdict, float(scores.max()), n_high, n_medium, len(results)
+    )
+    return ratings, verdict, confidence
@@ -2,24 +2,33 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
-from dotenv import load_dotenv
-load_dotenv()
+from src.env import load_env
+load_env()
 
 logging.basicConfig(level=logging.INFO, format="%(name)s %(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
-
-from src.models import MilitaryBranch, UserProposal
+from src.embeddings.encoder import warm_up
+from src.models import UserProposal
 from src.pipeline import run_pipeline
 from src.auth import AccessGateMiddleware, register_gate_routes
 
-app = FastAPI(title="Uncharted Waters Explorer", version="0.2.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the embedding model before serving so no request pays the cold start
+    await asyncio.to_thread(warm_up)
+    yield
+
+
+app = FastAPI(title="Uncharted Waters Explorer", version="0.2.0", lifespan=lifespan)
 
 app.add_middleware(AccessGateMiddleware)
 register_gate_routes(app)
@@ -27,38 +36,31 @@ register_gate_routes(app)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
-@app.get("/", response_class=HTMLResponse)
+@app.get("/", response_class=FileResponse)
 async def index():
-    with open("static/index.html", encoding="utf-8") as f:
-        return f.read()
+    # Streamed off the event loop by Starlette and re-read per request, so edits
+    # reach browsers once their 60s copy expires. "private" keeps shared caches
+    # from serving the gated page to clients without an access cookie.
+    return FileResponse(
+        "static/index.html",
+        media_type="text/html",
+        headers={"Cache-Control": "private, max-age=60", "Vary": "Cookie"},
+    )
 
 
-class ExploreRequest(BaseModel):
-    title: str
-    topic_description: str = ""
-    abstract: str = ""
-    keywords: list[str] = Field(default_factory=list)
-    military_branch: MilitaryBranch = MilitaryBranch.NAVY
-    additional_context: str = ""
+class ExploreRequest(UserProposal):
+    """Request body for /api/explore — already a validated UserProposal."""
 
 
 async def _run_explore(request: ExploreRequest):
-    proposal = UserProposal(
-        title=request.title,
-        abstract=request.abstract,
-        topic_description=request.topic_description,
-        keywords=request.keywords,
-        military_branch=request.military_branch,
-        additional_context=request.additional_context,
-    )
-    report, markdown, summary, landscape_map = await run_pipeline(proposal)
+    report, markdown, summary, landscape_map = await run_pipeline(request)
     return {
         "verdict": report.verdict.value,
         "confidence": report.confidence,
         "markdown": markdown,
         "summary": report.executive_summary,
         "step_summary": summary,
-        "report": report.model_dump(),
+        "report": report,
         "landscape_map": landscape_map,
     }
 
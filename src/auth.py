@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import hashlib
+import hmac
 import logging
 import os
 from string import Template
+from urllib.parse import parse_qs
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.requests import Request, cookie_parser
 from starlette.responses import HTMLResponse, RedirectResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi import FastAPI
 
 logger = logging.getLogger(__name__)
@@ -17,14 +19,19 @@ logger = logging.getLogger(__name__)
 ACCESS_CODE = os.environ.get("ACCESS_CODE", "").strip()
 COOKIE_NAME = "access_token"
 COOKIE_MAX_AGE = 60 * 60 * 24 * 30  # 30 days
+MAX_GATE_BODY_BYTES = 1024  # the form has a single short field
 
-print(f"[auth] Access gate: {'ENABLED' if ACCESS_CODE else 'DISABLED (no ACCESS_CODE set)'}")
+logger.info("Access gate: %s", "ENABLED" if ACCESS_CODE else "DISABLED (no ACCESS_CODE set)")
 
 
 def _hash_code(code: str) -> str:
     return hashlib.sha256(code.encode()).hexdigest()
 
 
+# Cookie value for a valid session; computed once instead of per request
+_EXPECTED_TOKEN = _hash_code(ACCESS_CODE) if ACCESS_CODE else ""
+
+
 _GATE_TEMPLATE = Template("""\
 <!DOCTYPE html>
 <html lang="en">
@@ -120,28 +127,66 @@ _GATE_TEMPLATE = Template("""\
 </html>
 """)
 
+# Only two variants are ever served, so render and encode them once
+_GATE_HTML = _GATE_TEMPLATE.substitute(error="").encode()
+_GATE_ERROR_HTML = _GATE_TEMPLATE.substitute(
+    error='<div class="gate-error">Invalid access code.</div>'
+).encode()
+
+
+_GATE_REDIRECT = RedirectResponse("/gate", status_code=303)
+
+
+def _has_valid_token(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            token = cookie_parser(value.decode("latin-1")).get(COOKIE_NAME, "")
+            return hmac.compare_digest(token.encode(), _EXPECTED_TOKEN.encode())
+    return False
+
 
-class AccessGateMiddleware(BaseHTTPMiddleware):
+class AccessGateMiddleware:
     """Redirects unauthenticated requests to the gate page.
 
+    Plain ASGI middleware: the path and cookie are read straight from the
+    scope, so allowed requests pass through without building a Request.
     If ACCESS_CODE is not set the middleware is a no-op (local dev mode).
     """
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if not ACCESS_CODE:
-            return await call_next(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        path = request.url.path
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not ACCESS_CODE or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
 
         # Allow gate routes and static assets through
-        if path == "/gate" or path.startswith("/static"):
-            return await call_next(request)
+        if path == "/gate" or path.startswith("/static") or _has_valid_token(scope):
+            await self.app(scope, receive, send)
+            return
+
+        await _GATE_REDIRECT(scope, receive, send)
+
 
-        token = request.cookies.get(COOKIE_NAME, "")
-        if token == _hash_code(ACCESS_CODE):
-            return await call_next(request)
+async def _read_gate_code(request: Request) -> str | None:
+    """Return the submitted ``code`` field, or None if the body is oversized/malformed.
 
-        return RedirectResponse("/gate", status_code=303)
+    The form is a single url-encoded field, so it is parsed directly rather
+    than through Starlette's multipart-capable form parser.
+    """
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_GATE_BODY_BYTES:
+            return None
+    try:
+        fields = parse_qs(body.decode("utf-8", "replace"), max_num_fields=4)
+    except ValueError:
+        return None
+    return fields.get("code", [""])[0].strip()
 
 
 def register_gate_routes(app: FastAPI) -> None:
@@ -149,19 +194,22 @@ def register_gate_routes(app: FastAPI) -> None:
 
     @app.get("/gate", response_class=HTMLResponse)
     async def gate_page():
-        return _GATE_TEMPLATE.substitute(error="")
+        return HTMLResponse(_GATE_HTML)
 
     @app.post("/gate")
     async def gate_submit(request: Request):
-        form = await request.form()
-        code = str(form.get("code", "")).strip()
-        print(f"[auth] Gate attempt: code_len={len(code)}, access_code_set={bool(ACCESS_CODE)}")
+        code = await _read_gate_code(request)
+        if code is None:
+            return Response(status_code=413)
+        logger.debug(
+            "Gate attempt: code_len=%d, access_code_set=%s", len(code), bool(ACCESS_CODE)
+        )
 
-        if ACCESS_CODE and code == ACCESS_CODE:
+        if ACCESS_CODE and hmac.compare_digest(code.encode(), ACCESS_CODE.encode()):
             response = RedirectResponse("/", status_code=303)
             response.set_cookie(
                 COOKIE_NAME,
-                _hash_code(ACCESS_CODE),
+                _EXPECTED_TOKEN,
                 max_age=COOKIE_MAX_AGE,
                 httponly=True,
                 secure=True,
@@ -169,7 +217,4 @@ def register_gate_routes(app: FastAPI) -> None:
             )
             return response
 
-        html = _GATE_TEMPLATE.substitute(
-            error='<div class="gate-error">Invalid access code.</div>'
-        )
-        return HTMLResponse(html, status_code=403)
+        return HTMLResponse(_GATE_ERROR_HTML, status_code=403)
@@ -8,8 +8,8 @@ import logging
 import os
 import sys
 
-from dotenv import load_dotenv
-load_dotenv()
+from src.env import load_env
+load_env()
 
 from src.config import DEFAULT_OUTPUT_DIR
 from src.models import MilitaryBranch, UserProposal, Verdict
@@ -98,7 +98,14 @@ async def main(argv: list[str] | None = None) -> int:
 
 
 def cli_entry():
-    sys.exit(asyncio.run(main()))
+    # uvloop is optional; it speeds up the scraper's many HTTP round trips
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        sys.exit(runner.run(main()))
 
 
 if __name__ == "__main__":
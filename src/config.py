@@ -16,6 +16,10 @@ SEARCH_FIELD = "full_search"
 REQUEST_DELAY_SECONDS = 2.0
 MAX_PAGES = 5
 DETAIL_FETCH_TOP_N = 50
+SEARCH_CONCURRENCY = 4  # queries in flight at once; each still paginates sequentially
+# Optional on-disk cache of results.json pages for repeated dev runs (off when unset)
+SEARCH_CACHE_PATH = os.environ.get("SEARCH_CACHE_PATH", "")
+SEARCH_CACHE_TTL_SECONDS = 60 * 60 * 24
 USER_AGENT = (
     "Uncharted-Waters/0.1 "
     "(Research Landscape Analysis Tool; "
@@ -26,6 +30,15 @@ USER_AGENT = (
 DEFAULT_EMBEDDING_MODEL = "nomic-ai/nomic-embed-text-v1.5"
 FALLBACK_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+# PyTorch device for the embedding model (default: auto, CUDA when available)
+# and whether to run it in float16 on GPU
+EMBEDDING_DEVICE = os.environ.get("EMBEDDING_DEVICE") or None
+EMBEDDING_FP16 = os.environ.get("EMBEDDING_FP16", "").lower() in ("1", "true", "yes")
+# Optional ONNX export of EMBEDDING_MODEL to run with onnxruntime instead of PyTorch
+ONNX_MODEL_PATH = os.environ.get("ONNX_MODEL_PATH", "")
+
+# Optional embedding cache for proposals, keywords, and publications (off when unset)
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "")
 
 # Similarity thresholds
 SIMILARITY_TOP_K = 20
@@ -42,6 +55,20 @@ OVERLAP_MEDIUM_THRESHOLD = 0.50
 # LLM settings
 LLM_MODEL = "claude-sonnet-4-5-20250929"
 LLM_MAX_TOKENS = 8192
+LLM_BATCH_POLL_SECONDS = 30.0  # Message Batches status polling interval
+
+# Prompt caching: blocks shorter than the model's minimum cacheable prompt
+# (~1024 tokens ≈ 4096 chars) are sent without a cache breakpoint
+PROMPT_CACHE_MIN_CHARS = 4096
+# Re-send the static prompt prefix this often so its cache entry (5-minute TTL)
+# survives gaps between analyses; 0 disables. Warming stops after the idle period.
+PROMPT_CACHE_KEEPALIVE_SECONDS = float(os.environ.get("PROMPT_CACHE_KEEPALIVE_SECONDS", "0"))
+PROMPT_CACHE_KEEPALIVE_IDLE_SECONDS = 30 * 60
+
+# Optional LLM response cache for repeated topic/result sets (off when unset)
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "")
+LLM_CACHE_TTL_SECONDS = 60 * 60 * 24
+LLM_CACHE_MIN_SIMILARITY = 0.97  # cosine between topic embeddings for a near-match
 
 # Military branch detection patterns
 BRANCH_PATTERNS: dict[str, list[str]] = {
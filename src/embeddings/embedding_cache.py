@@ -0,0 +1,116 @@
+"""Persistent cache of text embeddings keyed by model and exact input text."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from src.config import EMBEDDING_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS embeddings_q8 (
+    model TEXT NOT NULL,
+    key BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    scale REAL NOT NULL,
+    PRIMARY KEY (model, key)
+);
+"""
+
+# Stay well under SQLite's bound-parameter limit when looking up many keys
+_LOOKUP_CHUNK = 500
+
+
+def text_key(text: str) -> bytes:
+    """Content address of an embedding input (including any task prefix)."""
+    return hashlib.sha256(text.encode()).digest()
+
+
+def quantize_int8(arr: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization: ``arr ≈ q * scale[:, None]``."""
+    arr = np.asarray(arr, dtype=np.float32)
+    peak = np.abs(arr).max(axis=1)
+    scale = np.where(peak > 0, peak / 127, 1.0).astype(np.float32)
+    q = np.rint(arr / scale[:, None]).astype(np.int8)
+    return q, scale
+
+
+def dequantize_int8(q: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Inverse of :func:`quantize_int8`, re-normalized to unit length."""
+    arr = q.astype(np.float32) * scale[:, None]
+    norms = np.linalg.norm(arr, axis=1, keepdims=True)
+    return arr / np.where(norms > 0, norms, 1.0)
+
+
+class EmbeddingCache:
+    """SQLite-backed store of int8-quantized embedding rows.
+
+    Rows are keyed on ``(model name, sha256 of the exact input text)``, so a
+    changed title/abstract or a different model simply misses. Vectors are
+    stored as int8 with a per-row scale (4x smaller than float32) and come
+    back dequantized to unit-length float32.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get_many(self, model: str, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Return the cached rows for whichever of ``keys`` are present."""
+        found_keys: list[bytes] = []
+        blobs: list[bytes] = []
+        scales: list[float] = []
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), _LOOKUP_CHUNK):
+            chunk = unique[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob, scale in self._conn.execute(
+                "SELECT key, vector, scale FROM embeddings_q8 "
+                f"WHERE model = ? AND key IN ({placeholders})",
+                (model, *chunk),
+            ):
+                found_keys.append(key)
+                blobs.append(blob)
+                scales.append(scale)
+        if not found_keys:
+            return {}
+
+        q = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(blobs), -1)
+        rows = dequantize_int8(q, np.array(scales, dtype=np.float32))
+        return dict(zip(found_keys, rows))
+
+    def put_many(self, model: str, keys: list[bytes], vectors: np.ndarray) -> np.ndarray:
+        """Insert or replace rows and return them as :meth:`get_many` would."""
+        if not keys:
+            return np.asarray(vectors, dtype=np.float32)
+        q, scale = quantize_int8(vectors)
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings_q8 VALUES (?, ?, ?, ?)",
+                zip([model] * len(keys), keys, map(bytes, q), scale.tolist()),
+            )
+        return dequantize_int8(q, scale)
+
+
+_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Return the shared cache, or None when caching is disabled."""
+    global _cache
+    if not EMBEDDING_CACHE_PATH:
+        return None
+    if _cache is None:
+        _cache = EmbeddingCache(EMBEDDING_CACHE_PATH)
+    return _cache
@@ -3,47 +3,84 @@
 from __future__ import annotations
 
 import logging
+import threading
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from src.config import (
     DEFAULT_EMBEDDING_MODEL,
+    EMBEDDING_DEVICE,
+    EMBEDDING_FP16,
     EMBEDDING_MODEL,
     FALLBACK_EMBEDDING_MODEL,
+    ONNX_MODEL_PATH,
 )
+from src.embeddings.embedding_cache import get_embedding_cache, text_key
+from src.embeddings.onnx_backend import OnnxEncoder
 from src.models import Publication, UserProposal
 
 logger = logging.getLogger(__name__)
 
-_model: SentenceTransformer | None = None
+_model: SentenceTransformer | OnnxEncoder | None = None
 _model_name: str = ""
+# Task prefixes for the loaded model (nomic-embed uses asymmetric prefixes)
+_query_prefix: str = ""
+_doc_prefix: str = ""
+_model_lock = threading.Lock()
 
 
-def get_model() -> SentenceTransformer:
-    """Load the embedding model (cached singleton)."""
-    global _model, _model_name
+def _set_model(model: SentenceTransformer | OnnxEncoder, model_name: str) -> None:
+    global _model, _model_name, _query_prefix, _doc_prefix
+    _model, _model_name = model, model_name
+    is_nomic = "nomic" in model_name.lower()
+    _query_prefix = "search_query: " if is_nomic else ""
+    _doc_prefix = "search_document: " if is_nomic else ""
+
+
+def get_model() -> SentenceTransformer | OnnxEncoder:
+    """Load the embedding model (cached singleton, loaded at most once)."""
     if _model is not None:
         return _model
+    with _model_lock:
+        if _model is None:
+            _load_model()
+    return _model
+
+
+def _load_sentence_transformer(model_name: str, **kwargs) -> None:
+    model = SentenceTransformer(model_name, device=EMBEDDING_DEVICE, **kwargs)
+    if EMBEDDING_FP16 and model.device.type != "cpu":
+        # Tensor-core matmuls; outputs are cast back to float32 by _as_float32
+        model.half()
+        model_name = f"{model_name} (fp16)"
+    _set_model(model, model_name)
+
 
+def _load_model() -> None:
     model_name = EMBEDDING_MODEL
+    if ONNX_MODEL_PATH:
+        try:
+            # The export path is part of the name so cached vectors from a
+            # different export never match
+            _set_model(OnnxEncoder(ONNX_MODEL_PATH), f"{model_name} (onnx: {ONNX_MODEL_PATH})")
+            return
+        except Exception as e:
+            logger.warning("Failed to load ONNX model %s: %s. Using PyTorch.", ONNX_MODEL_PATH, e)
+
     try:
         logger.info("Loading embedding model: %s", model_name)
-        _model = SentenceTransformer(model_name, trust_remote_code=True)
-        _model_name = model_name
+        _load_sentence_transformer(model_name, trust_remote_code=True)
         logger.info("Model loaded successfully")
     except Exception as e:
         logger.warning("Failed to load %s: %s. Falling back to MiniLM.", model_name, e)
         model_name = FALLBACK_EMBEDDING_MODEL
-        _model = SentenceTransformer(model_name)
-        _model_name = model_name
-
-    return _model
+        _load_sentence_transformer(model_name)
 
 
-def _is_nomic() -> bool:
-    """Check if current model is nomic-embed (uses task prefixes)."""
-    return "nomic" in _model_name.lower()
+def warm_up() -> None:
+    """Load the model and run one tiny encode so the first request starts warm."""
+    get_model().encode(["warmup"], normalize_embeddings=True)
 
 
 def format_proposal_text(proposal: UserProposal) -> str:
@@ -68,32 +105,94 @@ def format_publication_text(pub: Publication) -> str:
     return " ".join(parts)
 
 
+def _proposal_input(proposal: UserProposal) -> str:
+    return _query_prefix + format_proposal_text(proposal)
+
+
+def _concept_inputs(concepts: list[str]) -> list[str]:
+    prefix = _query_prefix
+    return [prefix + t for t in concepts]
+
+
+def _publication_inputs(publications: list[Publication]) -> list[str]:
+    prefix = _doc_prefix
+    return [prefix + format_publication_text(pub) for pub in publications]
+
+
+def _as_float32(embeddings: np.ndarray) -> np.ndarray:
+    """C-contiguous float32, so the similarity matmuls hit BLAS without a packing copy."""
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+def _encode_cached(model: SentenceTransformer | OnnxEncoder, texts: list[str]) -> np.ndarray:
+    """Encode texts in one model call, reusing rows from the embedding cache.
+
+    Only cache misses reach the model; with the cache disabled every text does.
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    cache = get_embedding_cache()
+    if cache is None:
+        return _as_float32(model.encode(texts, normalize_embeddings=True, show_progress_bar=True))
+
+    keys = [text_key(t) for t in texts]
+    rows = cache.get_many(_model_name, keys)
+    if rows:
+        logger.info("Embedding cache: %d/%d inputs cached", sum(k in rows for k in keys), len(keys))
+
+    text_by_key = dict(zip(keys, texts))
+    missing = [k for k in text_by_key if k not in rows]
+    if missing:
+        fresh = _as_float32(
+            model.encode(
+                [text_by_key[k] for k in missing],
+                normalize_embeddings=True,
+                show_progress_bar=True,
+            )
+        )
+        # Use the stored (quantized) form so scores match later cache hits
+        rows.update(zip(missing, cache.put_many(_model_name, missing, fresh)))
+    return np.stack([rows[k] for k in keys])
+
+
 def encode_proposal(proposal: UserProposal) -> np.ndarray:
     """Encode a research proposal into an embedding vector."""
-    model = get_model()
-    text = format_proposal_text(proposal)
-    if _is_nomic():
-        text = "search_query: " + text
-    return model.encode([text], normalize_embeddings=True)[0]
+    return _encode_cached(get_model(), [_proposal_input(proposal)])[0]
 
 
 def encode_concepts(concepts: list[str]) -> np.ndarray:
     """Encode individual concept/keyword strings as separate query embeddings."""
     if not concepts:
         return np.array([])
-    model = get_model()
-    texts = list(concepts)
-    if _is_nomic():
-        texts = ["search_query: " + t for t in texts]
-    return model.encode(texts, normalize_embeddings=True)
+    return _encode_cached(get_model(), _concept_inputs(concepts))
 
 
 def encode_publications(publications: list[Publication]) -> np.ndarray:
     """Encode a list of publications into embedding vectors."""
-    model = get_model()
-    texts = [format_publication_text(pub) for pub in publications]
+    texts = _publication_inputs(publications)
     if not texts:
         return np.array([])
-    if _is_nomic():
-        texts = ["search_document: " + t for t in texts]
-    return model.encode(texts, normalize_embeddings=True, show_progress_bar=True)
+    return _encode_cached(get_model(), texts)
+
+
+def encode_for_ranking(
+    proposal: UserProposal,
+    publications: list[Publication],
+    concepts: list[str] | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Encode a proposal, its keyword concepts, and candidate publications in one model call.
+
+    Any of them already in the embedding cache are not re-encoded.
+
+    Returns ``(proposal_embedding, pub_embeddings, concept_embeddings)``,
+    equivalent to :func:`encode_proposal`, :func:`encode_publications`, and
+    :func:`encode_concepts`; ``concept_embeddings`` is a ``(0, dim)`` float32
+    block without concepts, so it can be stacked with the proposal row.
+    """
+    concepts = concepts or []
+    out = _encode_cached(
+        get_model(),
+        [_proposal_input(proposal), *_concept_inputs(concepts), *_publication_inputs(publications)],
+    )
+    n_lead = 1 + len(concepts)
+    return out[0], out[n_lead:], out[1:n_lead]
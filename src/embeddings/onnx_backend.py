@@ -0,0 +1,121 @@
+"""Optional ONNX Runtime encoder used in place of SentenceTransformer on CPU.
+
+Enabled by pointing ONNX_MODEL_PATH at a directory produced by the export
+command below (requires ``onnxruntime``; exporting also needs ``optimum``)::
+
+    python -m src.embeddings.onnx_backend nomic-ai/nomic-embed-text-v1.5 models/nomic-onnx --quantize
+
+The export must come from the same model as EMBEDDING_MODEL so task
+prefixes and cached embeddings stay consistent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_QUANTIZED_FILE = "model_quantized.onnx"
+_MODEL_FILE = "model.onnx"
+_MAX_SEQ_LENGTH = 8192
+
+
+def _mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Average token embeddings over the non-padding positions."""
+    mask = attention_mask[..., None].astype(np.float32)
+    return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+class OnnxEncoder:
+    """Mean-pooling sentence encoder backed by an ONNX Runtime session.
+
+    Exposes the subset of ``SentenceTransformer.encode`` used by the encoder
+    module, so it can be returned from ``get_model()`` unchanged.
+    """
+
+    def __init__(self, model_dir: str | Path):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = Path(model_dir)
+        model_file = model_dir / _QUANTIZED_FILE
+        if not model_file.exists():
+            model_file = model_dir / _MODEL_FILE
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            str(model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_seq_length = min(self.tokenizer.model_max_length, _MAX_SEQ_LENGTH)
+        logger.info("Loaded ONNX encoder from %s", model_file)
+
+    def encode(
+        self,
+        texts: list[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **_: object,
+    ) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            enc = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feed = {
+                name: value.astype(np.int64)
+                for name, value in enc.items()
+                if name in self._input_names
+            }
+            hidden = self._session.run(None, feed)[0]
+            batches.append(_mean_pool(hidden, enc["attention_mask"]))
+
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = np.concatenate(batches).astype(np.float32)
+        if normalize_embeddings:
+            embeddings = np.divide(
+                embeddings, np.linalg.norm(embeddings, axis=1, keepdims=True)
+            )
+        return embeddings
+
+
+def export(model_name: str, output_dir: str | Path, quantize: bool = False) -> Path:
+    """Export a Hugging Face model to ONNX, optionally with int8 weights."""
+    from optimum.exporters.onnx import main_export
+
+    output_dir = Path(output_dir)
+    main_export(
+        model_name,
+        output=output_dir,
+        task="feature-extraction",
+        trust_remote_code=True,
+    )
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            output_dir / _MODEL_FILE,
+            output_dir / _QUANTIZED_FILE,
+            weight_type=QuantType.QInt8,
+        )
+    return output_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export an embedding model to ONNX")
+    parser.add_argument("model", help="Hugging Face model name")
+    parser.add_argument("output_dir", help="Directory to write the ONNX model and tokenizer")
+    parser.add_argument("--quantize", action="store_true", help="Also write an int8 model")
+    args = parser.parse_args()
+    print(f"Exported to {export(args.model, args.output_dir, args.quantize)}")
@@ -4,17 +4,50 @@ from __future__ import annotations
 
 import numpy as np
 
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
 from src.config import (
     CONCEPT_MATCH_THRESHOLD,
     SIMILARITY_THRESHOLD,
     SIMILARITY_TOP_K,
 )
 from src.models import Publication, SimilarityResult, UserProposal
-from src.embeddings.encoder import encode_concepts, encode_proposal, encode_publications
+from src.embeddings.encoder import encode_for_ranking
+
+
+def _simsimd_usable() -> bool:
+    # Older SimSIMD releases report the inner-product *distance* (1 - a·b)
+    probe = np.array([[1.0, 2.0]], dtype=np.float32)
+    return np.allclose(np.asarray(simsimd.cdist(probe, probe, metric="dot")), 5.0)
+
+
+if simsimd is not None and not _simsimd_usable():
+    simsimd = None
+
+
+def _inner(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise inner products ``a @ b.T`` of float32 matrices (SimSIMD when installed).
+
+    Inputs are coerced to C-contiguous float32 (a no-op for encoder output),
+    since SimSIMD rejects mismatched dtypes and NumPy would promote them.
+    """
+    a = np.ascontiguousarray(a, dtype=np.float32)
+    b = np.ascontiguousarray(b, dtype=np.float32)
+    if simsimd is not None:
+        return np.asarray(simsimd.cdist(a, b, metric="dot"), dtype=np.float32)
+    return a @ b.T
 
 
 class RankingResult:
-    """Container for similarity ranking output including embeddings for visualization."""
+    """Container for similarity ranking output including embeddings for visualization.
+
+    ``pub_embeddings`` is a C-contiguous float32 ``(n_pubs, dim)`` block of
+    L2-normalized rows, as produced by the encoder. ``concept_embeddings``
+    holds one float32 row per entry of ``concepts`` (``(0, dim)`` without keywords).
+    """
 
     def __init__(
         self,
@@ -24,6 +57,8 @@ class RankingResult:
         publications: list[Publication],
         similarities: np.ndarray,
         threshold: float,
+        concepts: list[str] | None = None,
+        concept_embeddings: np.ndarray | None = None,
     ):
         self.results = results
         self.proposal_embedding = proposal_embedding
@@ -31,6 +66,10 @@ class RankingResult:
         self.publications = publications
         self.similarities = similarities
         self.threshold = threshold
+        self.concepts = concepts or []
+        if concept_embeddings is None:
+            concept_embeddings = np.empty((0, proposal_embedding.size), dtype=np.float32)
+        self.concept_embeddings = concept_embeddings
 
 
 def _extract_concepts(proposal: UserProposal) -> list[str]:
@@ -43,37 +82,26 @@ def _extract_concepts(proposal: UserProposal) -> list[str]:
     """
     if not proposal.keywords:
         return []
-    return list(proposal.keywords)[:20]
+    return proposal.keywords[:20]
 
 
-def _compute_idf_concept_scores(
-    proposal: UserProposal,
-    pub_embeddings: np.ndarray,
-) -> np.ndarray | None:
+def _compute_idf_concept_scores(concept_sims: np.ndarray) -> np.ndarray | None:
     """Compute IDF-weighted concept scores for each publication.
 
-    Concepts are extracted from the proposal's keywords, title, and topic
-    description. Each concept is encoded separately and matched against
+    Concepts are extracted from the proposal's keywords. Each concept is
+    encoded separately, and ``concept_sims`` holds its match against
     every publication. Keywords that appear in many publications (high
     document frequency) get low IDF weight — they're generic and not
     distinguishing. Keywords that appear in few publications get high IDF
     weight — they're specific and matching them is a strong signal.
 
     Returns an array of concept scores (one per publication), or None if
-    no concepts can be extracted.
+    there are no concepts.
     """
-    concepts = _extract_concepts(proposal)
-    n_pubs = pub_embeddings.shape[0] if pub_embeddings.ndim > 1 else 0
-    if not concepts or n_pubs == 0:
-        return None
-
-    concept_embeddings = encode_concepts(concepts)
-    if concept_embeddings.size == 0:
+    n_pubs, n_concepts = concept_sims.shape
+    if n_concepts == 0 or n_pubs == 0:
         return None
 
-    # concept_sims: (n_pubs, n_concepts) — per-keyword similarity for each pub
-    concept_sims = pub_embeddings @ concept_embeddings.T
-
     # Document frequency: how many pubs match each keyword (binary threshold)
     matches = concept_sims >= CONCEPT_MATCH_THRESHOLD
     df = matches.sum(axis=0).astype(float)  # (n_concepts,)
@@ -81,13 +109,21 @@ def _compute_idf_concept_scores(
     # IDF: log((N+1) / (df+1)) + 1  (smooth IDF, same as sklearn)
     idf = np.log((n_pubs + 1) / (df + 1)) + 1  # (n_concepts,)
 
-    # Weighted concept score: continuous similarities weighted by IDF
-    weighted = concept_sims * idf  # (n_pubs, n_concepts)
-    concept_scores = weighted.sum(axis=1) / idf.sum()  # (n_pubs,) normalized
+    # Weighted concept score: continuous similarities weighted by IDF,
+    # reduced by a single matrix-vector product
+    concept_scores = (concept_sims @ idf) / idf.sum()  # (n_pubs,) normalized
 
     return concept_scores
 
 
+def _top_k_positions(scores: np.ndarray, k: int) -> np.ndarray:
+    """Ascending positions of the k highest scores, ties going to earlier ones."""
+    cutoff = scores[np.argpartition(-scores, k - 1)[k - 1]]
+    above = np.flatnonzero(scores > cutoff)
+    ties = np.flatnonzero(scores == cutoff)[: k - above.size]
+    return np.sort(np.concatenate([above, ties]))
+
+
 def rank_publications(
     proposal: UserProposal,
     publications: list[Publication],
@@ -106,20 +142,35 @@ def rank_publications(
     Returns a RankingResult with the top_k publications above the similarity
     threshold (sorted descending) and raw embeddings for visualization.
     """
+    # Publications with neither a title nor an abstract would be encoded as
+    # a bare task prefix — skip the model call for them entirely
+    publications = [pub for pub in publications if pub.title or pub.best_abstract]
     if not publications:
         return RankingResult([], np.array([]), np.array([]), [], np.array([]), threshold)
 
-    proposal_embedding = encode_proposal(proposal)
-    pub_embeddings = encode_publications(publications)
+    concepts = _extract_concepts(proposal)
+    proposal_embedding, pub_embeddings, concept_embeddings = encode_for_ranking(
+        proposal, publications, concepts
+    )
 
     if pub_embeddings.size == 0:
         return RankingResult([], proposal_embedding, pub_embeddings, publications, np.array([]), threshold)
 
-    # Holistic cosine similarity — embeddings are already L2-normalized
-    raw_similarities = np.dot(pub_embeddings, proposal_embedding)
+    # A no-op for encoder output; custom encoders may hand back float64 or views
+    pub_embeddings = np.ascontiguousarray(pub_embeddings, dtype=np.float32)
+    proposal_embedding = np.ascontiguousarray(proposal_embedding, dtype=np.float32)
+
+    # Holistic and per-keyword cosine similarities in one pass over the
+    # publication matrix — embeddings are already L2-normalized
+    dim = proposal_embedding.size
+    queries = np.vstack(
+        [proposal_embedding[None, :], concept_embeddings.reshape(-1, dim)]
+    ).astype(np.float32, copy=False)
+    sims = _inner(pub_embeddings, queries)
+    raw_similarities = sims[:, 0]
 
     # IDF-weighted concept scores (None if no keywords provided)
-    concept_scores = _compute_idf_concept_scores(proposal, pub_embeddings)
+    concept_scores = _compute_idf_concept_scores(sims[:, 1:])
 
     if concept_scores is not None:
         # Weighted average: holistic-dominant so concept coverage refines
@@ -130,25 +181,28 @@ def rank_publications(
     else:
         final_scores = raw_similarities
 
-    # Build results using final scores for filtering/ranking
-    results: list[SimilarityResult] = []
-    for idx in range(len(publications)):
-        score = float(final_scores[idx])
-        if score >= threshold:
-            results.append(
-                SimilarityResult(
-                    publication=publications[idx],
-                    similarity_score=score,
-                )
-            )
-
-    # Sort by descending score
-    results.sort(key=lambda r: r.similarity_score, reverse=True)
-
-    # Take top_k and assign ranks
-    results = results[:top_k]
-    for i, result in enumerate(results):
-        result.rank = i + 1
+    # Filter by threshold, then partially sort so only the top_k survivors
+    # are fully ordered (descending score, ties by original position)
+    idxs = np.flatnonzero(final_scores >= threshold)
+    scores = final_scores[idxs]
+    if 0 < top_k < idxs.size:
+        keep = _top_k_positions(scores, top_k)
+        idxs, scores = idxs[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+
+    results = [
+        SimilarityResult(
+            publication=publications[idx],
+            similarity_score=score,
+            rank=rank,
+        )
+        for rank, (idx, score) in enumerate(
+            zip(idxs[order].tolist(), scores[order].tolist()), 1
+        )
+    ]
 
     # Store final (composite) scores so landscape map positions match overlap ratings
-    return RankingResult(results, proposal_embedding, pub_embeddings, publications, final_scores, threshold)
+    return RankingResult(
+        results, proposal_embedding, pub_embeddings, publications, final_scores, threshold,
+        concepts, concept_embeddings,
+    )
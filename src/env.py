@@ -0,0 +1,23 @@
+"""One-time ``.env`` loading shared by the API and CLI entry points."""
+
+from __future__ import annotations
+
+import os
+
+from dotenv import load_dotenv
+
+_LOADED_FLAG = "_UNCHARTED_WATERS_DOTENV_LOADED"
+
+
+def load_env() -> None:
+    """Load ``.env`` into the environment once per process tree.
+
+    Must run before ``src.config`` and ``src.auth`` are imported, since they
+    read settings at import time. Uvicorn workers and reload subprocesses
+    inherit the parent's environment, so the flag lets them skip re-reading
+    the file (``load_dotenv`` never overrides existing variables anyway).
+    """
+    if os.environ.get(_LOADED_FLAG):
+        return
+    load_dotenv()
+    os.environ[_LOADED_FLAG] = "1"
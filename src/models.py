@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from enum import Enum
+from functools import cached_property
 
 from pydantic import BaseModel, Field
 
@@ -57,6 +58,11 @@ class Publication(BaseModel):
     def best_abstract(self) -> str:
         return self.full_abstract or self.short_abstract
 
+    @cached_property
+    def branch_values(self) -> frozenset[str]:
+        """Detected branch values as a set, for membership checks during scoring."""
+        return frozenset(b.value for b in self.detected_branches)
+
 
 class SimilarityResult(BaseModel):
     """A publication with its computed similarity score."""
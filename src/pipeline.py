@@ -4,10 +4,16 @@ from __future__ import annotations
 
 import logging
 import os
+import string
 from pathlib import Path
 
 import numpy as np
 
+try:
+    from sklearn.utils.extmath import randomized_svd
+except ImportError:  # installed with sentence-transformers, but keep the plain SVD path
+    randomized_svd = None
+
 from src.analysis.llm_client import analyze_uniqueness
 from src.analysis.report import generate_markdown_report, generate_step_summary
 from src.config import DEFAULT_OUTPUT_DIR, SIMILARITY_THRESHOLD
@@ -17,6 +23,12 @@ from src.scraper.dimensions import DimensionsScraper
 
 logger = logging.getLogger(__name__)
 
+# Deletes every ASCII character not allowed in report filenames
+_FILENAME_ALLOWED = set(string.ascii_letters + string.digits + " -_")
+_FILENAME_TRANS = str.maketrans(
+    {c: None for c in map(chr, range(128)) if c not in _FILENAME_ALLOWED}
+)
+
 
 def generate_search_queries(proposal: UserProposal) -> list[SearchQuery]:
     """Generate multiple search queries from the proposal for broader coverage."""
@@ -54,6 +66,19 @@ def generate_search_queries(proposal: UserProposal) -> list[SearchQuery]:
     return queries
 
 
+def _first_principal_axis(centered: np.ndarray) -> np.ndarray:
+    """Leading right singular vector of ``centered`` (the 1D PCA direction).
+
+    A rank-1 randomized SVD is much cheaper than the full decomposition when
+    only the first component is used.
+    """
+    if randomized_svd is not None:
+        _, _, Vt = randomized_svd(centered, n_components=1, n_iter=2, random_state=0)
+    else:
+        _, _, Vt = np.linalg.svd(centered, full_matrices=False)
+    return Vt[0]
+
+
 def _compute_landscape_map(ranking) -> list[dict]:
     """Radial layout: query at center, distance from center = 1 - similarity.
 
@@ -64,50 +89,48 @@ def _compute_landscape_map(ranking) -> list[dict]:
         return []
 
     pubs = ranking.publications
-    sims = ranking.similarities
     n = len(pubs)
     if n == 0:
         return []
+    sims = np.zeros(n)
+    n_sims = min(n, len(ranking.similarities))
+    sims[:n_sims] = ranking.similarities[:n_sims]
 
     # Angular position: PCA 1D on publication embeddings for semantic grouping
     pub_emb = ranking.pub_embeddings
     centered = pub_emb - pub_emb.mean(axis=0)
     try:
-        _, _, Vt = np.linalg.svd(centered, full_matrices=False)
-        proj_1d = centered @ Vt[0]
+        proj_1d = centered @ _first_principal_axis(centered)
     except np.linalg.LinAlgError:
         proj_1d = np.zeros(n)
 
     # Sort by PCA score, assign evenly spaced angles
-    order = np.argsort(proj_1d)
-    angles = np.zeros(n)
-    for rank_idx, idx in enumerate(order):
-        angles[idx] = 2 * np.pi * rank_idx / n
+    angles = np.empty(n)
+    angles[np.argsort(proj_1d)] = 2 * np.pi * np.arange(n) / n
 
-    points = []
+    # Publications: polar to cartesian
+    radii = 1.0 - np.maximum(sims, 0.0)
+    xs = (radii * np.cos(angles)).tolist()
+    ys = (radii * np.sin(angles)).tolist()
+    above = (sims >= ranking.threshold).tolist()
 
-    # Query at center
-    points.append({
+    points = [{
         "x": 0.0,
         "y": 0.0,
         "type": "query",
         "label": "Your Topic",
         "similarity": 1.0,
-    })
-
-    # Publications: polar to cartesian
-    for i, pub in enumerate(pubs):
-        sim = float(sims[i]) if i < len(sims) else 0.0
-        radius = 1.0 - max(sim, 0.0)
-        angle = float(angles[i])
-        above = sim >= ranking.threshold
-        points.append({
-            "x": round(float(radius * np.cos(angle)), 4),
-            "y": round(float(radius * np.sin(angle)), 4),
-            "type": "relevant" if above else "background",
+    }]
+    points.extend(
+        {
+            "x": round(x, 4),
+            "y": round(y, 4),
+            "type": "relevant" if is_above else "background",
             "label": pub.title[:60],
             "similarity": round(sim, 3),
-        })
+        }
+        for pub, x, y, is_above, sim in zip(pubs, xs, ys, above, sims.tolist())
+    )
 
     return points
 
@@ -165,7 +188,10 @@ async def run_pipeline(
 
     # Step 5: LLM analysis
     logger.info("Running LLM analysis...")
-    report = await analyze_uniqueness(proposal, similarity_results, query_texts)
+    report = await analyze_uniqueness(
+        proposal, similarity_results, query_texts,
+        proposal_embedding=ranking.proposal_embedding,
+    )
 
     # Update counts with pre-filter totals
     report.total_results_found = len(publications)
@@ -190,7 +216,10 @@ def _save_report(markdown: str, title: str, output_dir: str) -> Path:
     """Save the markdown report to the output directory."""
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     # Sanitize filename
-    safe_title = "".join(c if c.isalnum() or c in " -_" else "" for c in title)
+    if title.isascii():
+        safe_title = title.translate(_FILENAME_TRANS)
+    else:
+        safe_title = "".join(c if c.isalnum() or c in " -_" else "" for c in title)
     safe_title = safe_title.strip().replace(" ", "_")[:80]
     filename = f"landscape_report_{safe_title}.md"
     filepath = Path(output_dir) / filename
@@ -22,5 +22,5 @@ class PublicationSource(ABC):
 
     @abstractmethod
     async def search_all(self, queries: list[SearchQuery]) -> list[Publication]:
-        """Run multiple queries and deduplicate results."""
+        """Run multiple queries (possibly concurrently) and deduplicate results."""
         ...
@@ -3,21 +3,27 @@
 from __future__ import annotations
 
 import asyncio
+import importlib.util
 import logging
-import re
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urljoin
 
 import httpx
+import orjson
 from bs4 import BeautifulSoup
 
+try:
+    import ahocorasick
+except ImportError:  # optional; detect_branches falls back to substring checks
+    ahocorasick = None
+
 from src.config import (
     BRANCH_PATTERNS,
     DETAIL_FETCH_TOP_N,
-    DTIC_BASE_URL,
     DTIC_DETAIL_URL,
     DTIC_SEARCH_URL,
     MAX_PAGES,
     REQUEST_DELAY_SECONDS,
+    SEARCH_CONCURRENCY,
     SEARCH_FIELD,
     SEARCH_MODE,
     SEARCH_TYPE,
@@ -25,20 +31,51 @@ from src.config import (
 )
 from src.models import MilitaryBranch, Publication, SearchQuery
 from src.scraper.base import PublicationSource
+from src.scraper.response_cache import get_response_cache
 
 logger = logging.getLogger(__name__)
 
 
+# HTTP/2 lets concurrent queries share one connection; needs the optional h2 package
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# (branch, lowercased patterns) resolved once rather than per call
+_BRANCH_MATCHERS = tuple(
+    (MilitaryBranch(branch_key), tuple(p.lower() for p in patterns))
+    for branch_key, patterns in BRANCH_PATTERNS.items()
+)
+
+
+# Folds ";" into "," so author strings split on a single separator
+_AUTHOR_SEPARATORS = str.maketrans(";", ",")
+
+
+def _build_branch_automaton():
+    """Aho-Corasick automaton tagging every branch pattern in one pass."""
+    automaton = ahocorasick.Automaton()
+    for branch, patterns in _BRANCH_MATCHERS:
+        for pattern in patterns:
+            automaton.add_word(pattern, branch)
+    automaton.make_automaton()
+    return automaton
+
+
+_BRANCH_AUTOMATON = _build_branch_automaton() if ahocorasick is not None else None
+
+
 def detect_branches(text: str) -> list[MilitaryBranch]:
     """Detect military branches from acknowledgements or other text."""
     if not text:
         return []
     text_lower = text.lower()
+    if _BRANCH_AUTOMATON is not None:
+        hits = {branch for _, branch in _BRANCH_AUTOMATON.iter(text_lower)}
+        return [branch for branch, _ in _BRANCH_MATCHERS if branch in hits]
     branches = []
-    for branch_key, patterns in BRANCH_PATTERNS.items():
+    for branch, patterns in _BRANCH_MATCHERS:
         for pattern in patterns:
-            if pattern.lower() in text_lower:
-                branches.append(MilitaryBranch(branch_key))
+            if pattern in text_lower:
+                branches.append(branch)
                 break
     return branches
 
@@ -49,7 +86,7 @@ def _parse_publication(doc: dict) -> Publication:
     raw_authors = doc.get("author_list", [])
     if isinstance(raw_authors, str):
         # Live API returns a semicolon- or comma-separated string
-        for name in re.split(r"[;,]", raw_authors):
+        for name in raw_authors.translate(_AUTHOR_SEPARATORS).split(","):
             name = name.strip()
             if name:
                 authors.append(name)
@@ -72,20 +109,21 @@ def _parse_publication(doc: dict) -> Publication:
     ack = doc.get("acknowledgements", "") or ""
     funding = doc.get("funding_section", "") or ""
     # Combine acknowledgements and funding_section for branch detection
-    branch_text = f"{ack} {funding}".strip()
+    branch_text = f"{ack} {funding}" if ack and funding else ack or funding
     pub_id = str(doc.get("id", ""))
 
-    pub = Publication(
+    # Every field is normalized above, so skip re-validating it in Pydantic
+    pub = Publication.model_construct(
         id=pub_id,
-        title=doc.get("title", ""),
+        title=doc.get("title", "") or "",
         short_abstract=doc.get("short_abstract", "") or "",
         authors=authors,
         pub_year=pub_year,
         journal_title=doc.get("journal_title", "") or "",
         doi=doc.get("doi", "") or "",
         acknowledgements=ack,
-        times_cited=doc.get("times_cited", 0) or 0,
-        score=doc.get("score", 0.0) or 0.0,
+        times_cited=int(doc.get("times_cited", 0) or 0),
+        score=float(doc.get("score", 0.0) or 0.0),
         detected_branches=detect_branches(branch_text),
         url=f"{DTIC_DETAIL_URL}/{pub_id}" if pub_id else "",
     )
@@ -93,18 +131,29 @@ def _parse_publication(doc: dict) -> Publication:
 
 
 class DimensionsScraper(PublicationSource):
-    """Scraper for DTIC Dimensions results.json endpoint."""
+    """Scraper for DTIC Dimensions results.json endpoint.
 
-    def __init__(self, delay: float = REQUEST_DELAY_SECONDS):
+    Pass ``client`` to share one connection pool between scrapers; a shared
+    client is left open by :meth:`close` and is the caller's to close.
+    """
+
+    def __init__(
+        self,
+        delay: float = REQUEST_DELAY_SECONDS,
+        client: httpx.AsyncClient | None = None,
+    ):
         self.delay = delay
-        self.client = httpx.AsyncClient(
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
             headers={"User-Agent": USER_AGENT},
             timeout=30.0,
             follow_redirects=True,
+            http2=_HTTP2,
         )
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
 
     async def __aenter__(self):
         return self
@@ -124,19 +173,31 @@ class DimensionsScraper(PublicationSource):
         return f"{DTIC_SEARCH_URL}?{urlencode(params)}"
 
     async def _fetch_page(self, url: str) -> dict | None:
-        """Fetch a single results.json page."""
+        """Fetch a single results.json page.
+
+        Pages already in the response cache are returned without a request
+        (or the politeness delay).
+        """
+        cache = get_response_cache()
+        if cache is not None and (body := cache.get(url)) is not None:
+            return orjson.loads(body)
+
         await asyncio.sleep(self.delay)
         try:
             resp = await self.client.get(url)
             resp.raise_for_status()
-            return resp.json()
+            data = orjson.loads(resp.content)
         except (httpx.HTTPError, ValueError) as e:
             logger.warning("Failed to fetch %s: %s", url, e)
             return None
+        if cache is not None:
+            cache.put(url, resp.content)
+        return data
 
     async def search(self, query: SearchQuery) -> list[Publication]:
         """Search DTIC with a single query, paginating through results."""
         publications: list[Publication] = []
+        seen_ids: set[str] = set()
         url = self._build_search_url(query.text)
 
         for page_num in range(MAX_PAGES):
@@ -150,19 +211,21 @@ class DimensionsScraper(PublicationSource):
                 break
 
             for doc in docs:
-                pub = _parse_publication(doc)
-                publications.append(pub)
+                # Overlapping pages can repeat a document; skip it before parsing
+                pub_id = str(doc.get("id", ""))
+                if pub_id:
+                    if pub_id in seen_ids:
+                        continue
+                    seen_ids.add(pub_id)
+                publications.append(_parse_publication(doc))
 
             # Check for next page
             nav = data.get("navigation", {})
             next_url = nav.get("results_json")
             if not next_url:
                 break
-            # next_url is relative — build absolute
-            if next_url.startswith("/"):
-                url = f"{DTIC_BASE_URL}{next_url}"
-            else:
-                url = next_url
+            # next_url is usually root-relative; resolve it against the current page
+            url = urljoin(url, next_url)
 
         logger.info(
             "Query '%s' returned %d publications", query.strategy, len(publications)
@@ -184,12 +247,22 @@ class DimensionsScraper(PublicationSource):
         return publications
 
     async def search_all(self, queries: list[SearchQuery]) -> list[Publication]:
-        """Run multiple search queries and deduplicate by publication ID."""
+        """Run search queries concurrently and deduplicate by publication ID.
+
+        At most SEARCH_CONCURRENCY queries are in flight; results are merged
+        in query order, so the first query to return a publication wins.
+        """
+        semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+        async def run(query: SearchQuery) -> list[Publication]:
+            async with semaphore:
+                return await self.search(query)
+
+        results = await asyncio.gather(*(run(query) for query in queries))
+
         seen_ids: set[str] = set()
         all_pubs: list[Publication] = []
-
-        for query in queries:
-            pubs = await self.search(query)
+        for pubs in results:
             for pub in pubs:
                 if pub.id and pub.id not in seen_ids:
                     seen_ids.add(pub.id)
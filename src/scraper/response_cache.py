@@ -0,0 +1,76 @@
+"""Persistent cache of raw search result pages keyed by request URL."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from src.config import SEARCH_CACHE_PATH, SEARCH_CACHE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS responses (
+    key BLOB PRIMARY KEY,
+    body BLOB NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+def _url_key(url: str) -> bytes:
+    return hashlib.sha256(url.encode()).digest()
+
+
+class ResponseCache:
+    """SQLite-backed store of response bodies for GET requests.
+
+    Entries older than ``ttl_seconds`` are treated as misses, so a cached
+    run sees DTIC results no staler than the TTL.
+    """
+
+    def __init__(self, path: str | Path, ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get(self, url: str) -> bytes | None:
+        """Return the cached body for ``url`` if it is still fresh."""
+        row = self._conn.execute(
+            "SELECT body FROM responses WHERE key = ? AND created >= ?",
+            (_url_key(url), time.time() - self.ttl_seconds),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, url: str, body: bytes) -> None:
+        """Store a response body and evict expired entries."""
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (_url_key(url), body, now),
+            )
+
+
+_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the shared cache, or None when caching is disabled."""
+    global _cache
+    if not SEARCH_CACHE_PATH:
+        return None
+    if _cache is None:
+        _cache = ResponseCache(SEARCH_CACHE_PATH)
+    return _cache
@@ -0,0 +1,75 @@
+"""Tests for the access code gate."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import src.auth as auth
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(auth, "ACCESS_CODE", "secret")
+    monkeypatch.setattr(auth, "_EXPECTED_TOKEN", auth._hash_code("secret"))
+
+    app = FastAPI()
+    app.add_middleware(auth.AccessGateMiddleware)
+    auth.register_gate_routes(app)
+
+    @app.get("/")
+    async def index():
+        return {"ok": True}
+
+    @app.get("/static/app.js")
+    async def asset():
+        return {"asset": True}
+
+    return TestClient(app, base_url="https://testserver")
+
+
+class TestAccessGate:
+    def test_redirects_without_cookie(self, client):
+        response = client.get("/", follow_redirects=False)
+        assert response.status_code == 303
+        assert response.headers["location"] == "/gate"
+
+    def test_rejects_wrong_cookie(self, client):
+        client.cookies.set(auth.COOKIE_NAME, "nope")
+        response = client.get("/", follow_redirects=False)
+        assert response.status_code == 303
+
+    def test_static_and_gate_bypass(self, client):
+        assert client.get("/static/app.js").status_code == 200
+        gate = client.get("/gate")
+        assert gate.status_code == 200
+        assert "Invalid access code." not in gate.text
+
+    def test_wrong_code_is_forbidden(self, client):
+        response = client.post("/gate", data={"code": "bad"}, follow_redirects=False)
+        assert response.status_code == 403
+        assert "Invalid access code." in response.text
+
+    def test_oversized_body_is_rejected(self, client):
+        response = client.post("/gate", data={"code": "x" * 2000}, follow_redirects=False)
+        assert response.status_code == 413
+
+    def test_login_sets_cookie_and_grants_access(self, client):
+        response = client.post("/gate", data={"code": "secret"}, follow_redirects=False)
+        assert response.status_code == 303
+        assert client.get("/", follow_redirects=False).json() == {"ok": True}
+
+    def test_disabled_without_access_code(self, client, monkeypatch):
+        monkeypatch.setattr(auth, "ACCESS_CODE", "")
+        assert client.get("/", follow_redirects=False).status_code == 200
+
+
+class TestIndexCaching:
+    def test_gated_index_is_not_publicly_cacheable(self, monkeypatch):
+        from src.api import app
+
+        monkeypatch.setattr(auth, "ACCESS_CODE", "")
+        response = TestClient(app).get("/")
+        assert response.status_code == 200
+        cache_control = response.headers["cache-control"]
+        assert "private" in cache_control and "public" not in cache_control
+        assert response.headers["vary"] == "Cookie"
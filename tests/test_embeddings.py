@@ -79,6 +79,139 @@ class TestTextFormatting:
         assert "Short abstract only" in text
 
 
+class TestEncoding:
+    def test_proposal_and_publications_share_one_call(self, monkeypatch):
+        import src.embeddings.encoder as encoder
+
+        calls = []
+
+        class FakeModel:
+            def encode(self, texts, **kwargs):
+                calls.append(list(texts))
+                return np.arange(len(texts), dtype=np.float32)[:, None]
+
+        for name in ("_model", "_model_name", "_query_prefix", "_doc_prefix"):
+            monkeypatch.setattr(encoder, name, getattr(encoder, name))
+        monkeypatch.setattr(encoder, "_model", None)
+        monkeypatch.setattr(encoder, "SentenceTransformer", lambda *a, **kw: FakeModel())
+        monkeypatch.setattr(encoder, "EMBEDDING_MODEL", "nomic-ai/nomic-embed-text-v1.5")
+        monkeypatch.setattr(encoder, "ONNX_MODEL_PATH", "")
+        monkeypatch.setattr(encoder, "get_embedding_cache", lambda: None)
+        pubs = [Publication(id="pub.1", title="A"), Publication(id="pub.2", title="B")]
+
+        proposal_emb, pub_embs, concept_embs = encoder.encode_for_ranking(
+            UserProposal(title="Test"), pubs, ["sonar"]
+        )
+        assert calls == [[
+            "search_query: Test", "search_query: sonar", "search_document: A", "search_document: B",
+        ]]
+        assert proposal_emb.tolist() == [0.0]
+        assert concept_embs.tolist() == [[1.0]]
+        assert pub_embs.tolist() == [[2.0], [3.0]]
+
+    def test_cached_publications_skip_the_model(self, monkeypatch, tmp_path):
+        import src.embeddings.encoder as encoder
+        from src.embeddings.embedding_cache import EmbeddingCache
+
+        calls = []
+
+        class FakeModel:
+            def encode(self, texts, **kwargs):
+                calls.append(list(texts))
+                return np.array([[len(t) == 1, len(t) != 1] for t in texts], dtype=np.float32)
+
+        cache = EmbeddingCache(tmp_path / "emb.sqlite")
+        monkeypatch.setattr(encoder, "_model", FakeModel())
+        monkeypatch.setattr(encoder, "_model_name", "test-model")
+        monkeypatch.setattr(encoder, "get_embedding_cache", lambda: cache)
+        a, bb = Publication(id="pub.1", title="A"), Publication(id="pub.2", title="BB")
+
+        first = encoder.encode_publications([a])
+        _, second, _ = encoder.encode_for_ranking(UserProposal(title="Q"), [bb, a])
+        third = encoder.encode_publications([a, bb])
+        encoder.encode_for_ranking(UserProposal(title="Q"), [a])
+
+        assert calls == [["A"], ["Q", "BB"]]
+        assert first.tolist() == [[1.0, 0.0]]
+        assert second.tolist() == [[0.0, 1.0], [1.0, 0.0]]
+        assert third.tolist() == [[1.0, 0.0], [0.0, 1.0]]
+        cache.close()
+
+    def test_int8_round_trip_preserves_similarity(self):
+        from src.embeddings.embedding_cache import dequantize_int8, quantize_int8
+
+        rng = np.random.default_rng(0)
+        emb = rng.standard_normal((50, 768)).astype(np.float32)
+        emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+
+        q, scale = quantize_int8(emb)
+        restored = dequantize_int8(q, scale)
+        assert q.dtype == np.int8
+        assert np.allclose(np.linalg.norm(restored, axis=1), 1.0, atol=1e-5)
+        assert np.abs(restored @ emb[0] - emb @ emb[0]).max() < 0.01
+
+    def test_onnx_mean_pool_ignores_padding(self):
+        from src.embeddings.onnx_backend import _mean_pool
+
+        hidden = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]], dtype=np.float32)
+        mask = np.array([[1, 1, 0]])
+        assert _mean_pool(hidden, mask).tolist() == [[2.0, 3.0]]
+
+    def test_concurrent_get_model_loads_once(self, monkeypatch):
+        import threading
+        import time
+
+        import src.embeddings.encoder as encoder
+
+        loads = []
+
+        def slow_model(*args, **kwargs):
+            loads.append(args)
+            time.sleep(0.05)
+            return object()
+
+        for name in ("_model", "_model_name", "_query_prefix", "_doc_prefix"):
+            monkeypatch.setattr(encoder, name, getattr(encoder, name))
+        monkeypatch.setattr(encoder, "_model", None)
+        monkeypatch.setattr(encoder, "SentenceTransformer", slow_model)
+        monkeypatch.setattr(encoder, "ONNX_MODEL_PATH", "")
+
+        threads = [threading.Thread(target=encoder.get_model) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(loads) == 1
+
+    def test_cache_name_distinguishes_backends(self, monkeypatch):
+        import src.embeddings.encoder as encoder
+
+        class FakeTorchModel:
+            device = type("Device", (), {"type": "cuda"})()
+
+            def half(self):
+                return self
+
+        for name in ("_model", "_model_name", "_query_prefix", "_doc_prefix"):
+            monkeypatch.setattr(encoder, name, getattr(encoder, name))
+        monkeypatch.setattr(encoder, "SentenceTransformer", lambda *a, **kw: FakeTorchModel())
+        monkeypatch.setattr(encoder, "OnnxEncoder", lambda path: object())
+
+        def loaded_name(onnx_path="", fp16=False):
+            monkeypatch.setattr(encoder, "ONNX_MODEL_PATH", onnx_path)
+            monkeypatch.setattr(encoder, "EMBEDDING_FP16", fp16)
+            encoder._load_model()
+            return encoder._model_name
+
+        names = {
+            loaded_name(),
+            loaded_name(fp16=True),
+            loaded_name("models/a"),
+            loaded_name("models/b"),
+        }
+        assert len(names) == 4
+
+
 class TestSimilarityRanking:
     """Test similarity ranking logic (mocking the actual encoding)."""
 
@@ -88,3 +221,140 @@ class TestSimilarityRanking:
         proposal = UserProposal(title="Test")
         ranking = rank_publications(proposal, [], top_k=5, threshold=0.0)
         assert ranking.results == []
+
+    def test_rank_top_k_above_threshold(self, monkeypatch):
+        import src.embeddings.similarity as sim
+
+        scores = np.array([0.2, 0.9, 0.5, 0.7, 0.5, 0.1, 0.8], dtype=np.float32)
+        pubs = [Publication(id=f"pub.{i}", title=f"P{i}") for i in range(len(scores))]
+        monkeypatch.setattr(
+            sim,
+            "encode_for_ranking",
+            lambda p, pubs, concepts: (
+                np.array([1.0], dtype=np.float32), scores[:, None], np.array([])
+            ),
+        )
+
+        ranking = sim.rank_publications(UserProposal(title="Test"), pubs, top_k=4, threshold=0.3)
+        assert [r.publication.id for r in ranking.results] == ["pub.1", "pub.6", "pub.3", "pub.2"]
+        assert [r.rank for r in ranking.results] == [1, 2, 3, 4]
+
+        ranking = sim.rank_publications(UserProposal(title="Test"), pubs, top_k=10, threshold=0.3)
+        assert [r.publication.id for r in ranking.results] == [
+            "pub.1", "pub.6", "pub.3", "pub.2", "pub.4",
+        ]
+
+    def test_rank_skips_publications_without_text(self, monkeypatch):
+        import src.embeddings.similarity as sim
+
+        encoded = []
+
+        def fake_encode(p, pubs, concepts):
+            encoded.extend(pub.id for pub in pubs)
+            return np.array([1.0], dtype=np.float32), np.ones((len(pubs), 1), np.float32), np.array([])
+
+        monkeypatch.setattr(sim, "encode_for_ranking", fake_encode)
+        pubs = [
+            Publication(id="pub.blank", title=""),
+            Publication(id="pub.abstract", title="", short_abstract="Sonar arrays"),
+            Publication(id="pub.title", title="Sonar"),
+        ]
+        ranking = sim.rank_publications(UserProposal(title="Test"), pubs, top_k=5, threshold=0.0)
+        assert encoded == ["pub.abstract", "pub.title"]
+        assert [pub.id for pub in ranking.publications] == encoded
+
+    def test_rank_exposes_concept_embeddings(self, monkeypatch):
+        import src.embeddings.similarity as sim
+
+        concept_embs = np.eye(2, dtype=np.float32)
+        monkeypatch.setattr(
+            sim,
+            "encode_for_ranking",
+            lambda p, pubs, concepts: (
+                np.array([1.0, 0.0], dtype=np.float32), concept_embs.copy(), concept_embs
+            ),
+        )
+        pubs = [Publication(id=f"pub.{i}", title=f"P{i}") for i in range(2)]
+        proposal = UserProposal(title="Test", keywords=["sonar", "radar"])
+        ranking = sim.rank_publications(proposal, pubs, top_k=5, threshold=0.0)
+        assert ranking.concepts == ["sonar", "radar"]
+        assert ranking.concept_embeddings is concept_embs
+
+    def test_rank_without_keywords_stays_float32(self, monkeypatch):
+        import src.embeddings.encoder as encoder
+        import src.embeddings.similarity as sim
+
+        class FakeModel:
+            def encode(self, texts, **kwargs):
+                return np.eye(len(texts), 4, dtype=np.float32)
+
+        def strict_inner(a, b):
+            # Mirrors simsimd.cdist, which rejects mixed dtypes
+            if a.dtype != b.dtype:
+                raise TypeError("Input tensors must have matching datatypes")
+            assert a.dtype == np.float32
+            return a @ b.T
+
+        monkeypatch.setattr(encoder, "get_model", lambda: FakeModel())
+        monkeypatch.setattr(encoder, "get_embedding_cache", lambda: None)
+        monkeypatch.setattr(sim, "_inner", strict_inner)
+        pubs = [Publication(id=f"pub.{i}", title=f"P{i}") for i in range(3)]
+
+        ranking = sim.rank_publications(UserProposal(title="Test"), pubs, top_k=5, threshold=-1.0)
+        assert ranking.concept_embeddings.shape == (0, 4)
+        assert ranking.concept_embeddings.dtype == np.float32
+        assert ranking.similarities.dtype == np.float32
+        assert len(ranking.results) == 3
+
+    def test_rank_coerces_float64_noncontiguous_embeddings(self, monkeypatch):
+        import src.embeddings.similarity as sim
+
+        pubs64 = np.asfortranarray([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]])  # float64, F-order
+        monkeypatch.setattr(
+            sim,
+            "encode_for_ranking",
+            lambda p, pubs, concepts: (np.array([1.0, 0.0]), pubs64, np.array([])),
+        )
+        pubs = [Publication(id=f"pub.{i}", title=f"P{i}") for i in range(3)]
+        ranking = sim.rank_publications(UserProposal(title="Test"), pubs, top_k=5, threshold=0.3)
+
+        assert ranking.pub_embeddings.dtype == np.float32
+        assert ranking.pub_embeddings.flags.c_contiguous
+        assert [r.publication.id for r in ranking.results] == ["pub.0", "pub.1"]
+
+
+class TestInnerProducts:
+    def test_simsimd_path_receives_matching_float32(self, monkeypatch):
+        import src.embeddings.similarity as sim
+
+        seen = []
+
+        class FakeSimSIMD:
+            @staticmethod
+            def cdist(a, b, metric):
+                seen.append((a.dtype, b.dtype, a.flags.c_contiguous, b.flags.c_contiguous))
+                if a.dtype != b.dtype:
+                    raise TypeError("Input tensors must have matching datatypes")
+                return a @ b.T
+
+        monkeypatch.setattr(sim, "simsimd", FakeSimSIMD)
+        a = np.eye(3, dtype=np.float32)
+        b = np.asfortranarray([[1.0, 2.0, 3.0]])  # float64, not C-contiguous
+        out = sim._inner(a, b)
+
+        assert seen == [(np.float32, np.float32, True, True)]
+        assert out.dtype == np.float32
+        assert out[:, 0].tolist() == [1.0, 2.0, 3.0]
+
+    def test_simsimd_matches_numpy(self, monkeypatch):
+        import src.embeddings.similarity as sim
+
+        if sim.simsimd is None:
+            pytest.skip("simsimd not installed")
+        rng = np.random.default_rng(0)
+        a = rng.standard_normal((5, 8)).astype(np.float32)
+        b = rng.standard_normal((2, 8))
+        expected = a @ b.astype(np.float32).T
+        np.testing.assert_allclose(sim._inner(a, b), expected, rtol=1e-5)
+        monkeypatch.setattr(sim, "simsimd", None)
+        np.testing.assert_allclose(sim._inner(a, b), expected, rtol=1e-5)
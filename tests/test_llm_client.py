@@ -0,0 +1,439 @@
+"""Tests for prompt assembly and LLM response handling."""
+
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.analysis import llm_client
+from src.analysis.llm_cache import AnalysisCache
+from src.analysis.llm_client import _build_user_content, analyze_uniqueness_batch
+from src.analysis.prompts import (
+    ANALYSIS_INSTRUCTIONS,
+    build_analysis_prompt,
+    format_publications_for_prompt,
+)
+from src.models import MilitaryBranch, Publication, SimilarityResult, UserProposal, Verdict
+
+
+class TestPromptAssembly:
+    def _prompt(self, publications_text: str) -> tuple[str, str]:
+        return build_analysis_prompt(
+            proposal_title="Underwater Navigation",
+            proposal_abstract="GPS-denied navigation for AUVs",
+            proposal_keywords=["AUV", "navigation"],
+            proposal_branch="navy",
+            additional_context="",
+            publications_text=publications_text,
+            precomputed_metrics="**Landscape Assessment:** UNIQUE",
+        )
+
+    def test_prefix_holds_publications_suffix_holds_topic(self):
+        prefix, suffix = self._prompt("### Publication 1")
+        assert "### Publication 1" in prefix
+        assert "Underwater Navigation" not in prefix
+        assert "Underwater Navigation" in suffix
+        assert "AUV, navigation" in suffix
+        assert "Pre-Computed Metrics" in suffix
+
+    def test_content_blocks_order_and_cache_breakpoints(self):
+        prefix, suffix = self._prompt("x" * 10_000)
+        blocks = _build_user_content(prefix, suffix)
+        assert [b["text"] for b in blocks] == [ANALYSIS_INSTRUCTIONS, prefix, suffix]
+        assert "cache_control" in blocks[0]
+        assert "cache_control" in blocks[1]
+        assert "cache_control" not in blocks[2]
+
+    def test_short_publications_block_is_not_cached(self):
+        prefix, suffix = self._prompt("short")
+        blocks = _build_user_content(prefix, suffix)
+        assert "cache_control" not in blocks[1]
+
+    def test_keepalive_shares_the_cached_prefix(self):
+        prefix, suffix = self._prompt("x" * 10_000)
+        analysis = _build_user_content(prefix, suffix)
+        assert llm_client._cacheable_prefix(analysis) == analysis[:2]
+        keepalive = llm_client._keepalive_params(analysis[:2])
+        assert keepalive["system"] == llm_client._SYSTEM_BLOCKS
+        assert keepalive["messages"][0]["content"][:2] == analysis[:2]
+        assert keepalive["max_tokens"] == 1
+
+    def test_short_prompt_has_no_cacheable_prefix(self):
+        prefix, suffix = self._prompt("short")
+        assert llm_client._cacheable_prefix(_build_user_content(prefix, suffix)) is None
+
+    def test_publications_formatted_from_results(self):
+        text = format_publications_for_prompt([
+            SimilarityResult(
+                publication=Publication(id="pub.1", title="Sonar"),
+                similarity_score=0.5,
+            ),
+            SimilarityResult(
+                publication=Publication(
+                    id="pub.2", title="Radar", pub_year=2021,
+                    authors=["A. Smith", "B. Jones"], short_abstract="Radar work",
+                    detected_branches=[MilitaryBranch.NAVY, MilitaryBranch.ARMY],
+                    times_cited=3,
+                ),
+                similarity_score=0.25,
+            ),
+        ])
+        first, second = text.split("\n\n### ")
+        assert first.startswith("### Publication 1 (Similarity: 0.500)")
+        assert "- **Year:** Unknown" in first
+        assert "- **Authors:** Unknown" in first
+        assert "- **Funding Branches:** Unknown" in first
+        assert second.startswith("Publication 2 (Similarity: 0.250)")
+        assert "- **Year:** 2021" in second
+        assert "- **Authors:** A. Smith, B. Jones" in second
+        assert "- **Funding Branches:** navy, army" in second
+        assert "- **Abstract:** Radar work" in second
+
+
+def _unit(v: list[float]) -> np.ndarray:
+    arr = np.asarray(v, dtype=np.float32)
+    return arr / np.linalg.norm(arr)
+
+
+class TestAnalysisCache:
+    def test_exact_hit(self, tmp_path):
+        cache = AnalysisCache(tmp_path / "cache.sqlite")
+        emb = _unit([1.0, 0.0, 0.0])
+        cache.store(emb, ["pub.2", "pub.1"], "navy", {"executive_summary": "cached"})
+        hit = cache.lookup(emb, ["pub.1", "pub.2"], "navy")
+        assert hit == {"executive_summary": "cached"}
+        cache.close()
+
+    def test_near_duplicate_topic_hits(self, tmp_path):
+        cache = AnalysisCache(tmp_path / "cache.sqlite", min_similarity=0.97)
+        cache.store(_unit([1.0, 0.0, 0.0]), ["pub.1"], "navy", {"v": 1})
+        assert cache.lookup(_unit([1.0, 0.1, 0.0]), ["pub.1"], "navy") == {"v": 1}
+        assert cache.lookup(_unit([1.0, 1.0, 0.0]), ["pub.1"], "navy") is None
+        cache.close()
+
+    def test_miss_on_different_results_or_branch(self, tmp_path):
+        cache = AnalysisCache(tmp_path / "cache.sqlite")
+        emb = _unit([0.0, 1.0, 0.0])
+        cache.store(emb, ["pub.1"], "navy", {"v": 1})
+        assert cache.lookup(emb, ["pub.1", "pub.3"], "navy") is None
+        assert cache.lookup(emb, ["pub.1"], "army") is None
+        cache.close()
+
+    def test_miss_on_different_variant(self, tmp_path):
+        cache = AnalysisCache(tmp_path / "cache.sqlite")
+        emb = _unit([1.0, 1.0, 0.0])
+        cache.store(emb, ["pub.1"], "navy", {"v": 1}, "model-a|v1|")
+        assert cache.lookup(emb, ["pub.1"], "navy", "model-a|v1|") == {"v": 1}
+        assert cache.lookup(emb, ["pub.1"], "navy", "model-b|v1|") is None
+        assert cache.lookup(emb, ["pub.1"], "navy", "model-a|v1|focus") is None
+        cache.close()
+
+    def test_expired_entries_are_ignored(self, tmp_path):
+        cache = AnalysisCache(tmp_path / "cache.sqlite", ttl_seconds=-1)
+        emb = _unit([0.0, 0.0, 1.0])
+        cache.store(emb, ["pub.1"], "navy", {"v": 1})
+        assert cache.lookup(emb, ["pub.1"], "navy") is None
+        cache.close()
+
+
+def _message(payload: dict) -> SimpleNamespace:
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=json.dumps(payload))],
+        usage=SimpleNamespace(input_tokens=10),
+    )
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+class _FakeMessages:
+    """Stand-in for ``client.messages`` with a scripted batch outcome."""
+
+    def __init__(self, batch_results: list, direct_payload: dict):
+        self.direct_payload = direct_payload
+        self.direct_calls = 0
+        self.batch_requests: list = []
+        self._batch_results = batch_results
+        self.batches = SimpleNamespace(
+            create=self._create_batch,
+            retrieve=self._retrieve_batch,
+            results=self._batch_results_stream,
+        )
+
+    async def _create_batch(self, requests):
+        self.batch_requests = requests
+        return SimpleNamespace(id="batch_1", processing_status="in_progress")
+
+    async def _retrieve_batch(self, batch_id):
+        return SimpleNamespace(id=batch_id, processing_status="ended")
+
+    async def _batch_results_stream(self, batch_id):
+        return _aiter(self._batch_results)
+
+    @asynccontextmanager
+    async def stream(self, **params):
+        self.direct_calls += 1
+        text = json.dumps(self.direct_payload)
+
+        async def final_message():
+            return _message(self.direct_payload)
+
+        yield SimpleNamespace(
+            text_stream=_aiter([text[:5], text[5:]]),
+            get_final_message=final_message,
+        )
+
+
+def _analysis(title: str, score: float):
+    result = SimilarityResult(
+        publication=Publication(id=f"pub.{title}", title=title),
+        similarity_score=score,
+    )
+    return UserProposal(title=title, military_branch=MilitaryBranch.NAVY), [result], [title]
+
+
+class TestBatchAnalysis:
+    async def test_results_are_returned_in_input_order(self, monkeypatch):
+        batch_results = [
+            SimpleNamespace(custom_id="analysis-1", result=SimpleNamespace(
+                type="succeeded", message=_message({"executive_summary": "second"}))),
+            SimpleNamespace(custom_id="analysis-0", result=SimpleNamespace(
+                type="succeeded", message=_message({"executive_summary": "first"}))),
+        ]
+        messages = _FakeMessages(batch_results, {"executive_summary": "direct"})
+        monkeypatch.setattr(llm_client, "_make_client", lambda: SimpleNamespace(messages=messages))
+
+        reports = await analyze_uniqueness_batch(
+            [_analysis("alpha", 0.35), _analysis("beta", 0.75)], poll_interval=0
+        )
+
+        assert [r.executive_summary for r in reports] == ["first", "second"]
+        assert [r.verdict for r in reports] == [Verdict.UNIQUE, Verdict.AT_RISK]
+        assert len(messages.batch_requests) == 2
+        assert messages.direct_calls == 0
+
+    async def test_failed_entries_fall_back_to_single_call(self, monkeypatch):
+        batch_results = [
+            SimpleNamespace(custom_id="analysis-0", result=SimpleNamespace(
+                type="succeeded", message=_message({"executive_summary": "batched"}))),
+            SimpleNamespace(custom_id="analysis-1", result=SimpleNamespace(type="errored")),
+        ]
+        messages = _FakeMessages(batch_results, {"executive_summary": "direct"})
+        monkeypatch.setattr(llm_client, "_make_client", lambda: SimpleNamespace(messages=messages))
+
+        reports = await analyze_uniqueness_batch(
+            [_analysis("alpha", 0.35), _analysis("beta", 0.35)], poll_interval=0
+        )
+
+        assert [r.executive_summary for r in reports] == ["batched", "direct"]
+        assert messages.direct_calls == 1
+
+
+class TestCachedAnalysis:
+    async def test_model_and_context_changes_miss_the_cache(self, monkeypatch, tmp_path):
+        cache = AnalysisCache(tmp_path / "cache.sqlite")
+        messages = _FakeMessages([], {"executive_summary": "direct"})
+        monkeypatch.setattr(llm_client, "_make_client", lambda: SimpleNamespace(messages=messages))
+        monkeypatch.setattr(llm_client, "get_analysis_cache", lambda: cache)
+        proposal, results, queries = _analysis("alpha", 0.5)
+        emb = _unit([1.0, 0.0, 0.0])
+
+        async def analyze(p):
+            return await llm_client.analyze_uniqueness(p, results, queries, proposal_embedding=emb)
+
+        await analyze(proposal)
+        await analyze(proposal)
+        assert messages.direct_calls == 1
+
+        await analyze(proposal.model_copy(update={"additional_context": "undersea focus"}))
+        assert messages.direct_calls == 2
+
+        monkeypatch.setattr(llm_client, "LLM_MODEL", "another-model")
+        await analyze(proposal)
+        assert messages.direct_calls == 3
+        cache.close()
+
+
+class TestPromptCacheKeepalive:
+    async def test_starts_once_and_stops_when_idle(self, monkeypatch):
+        import asyncio
+
+        calls = []
+
+        async def create(**params):
+            calls.append(params)
+
+        monkeypatch.setattr(
+            llm_client, "_make_client",
+            lambda: SimpleNamespace(messages=SimpleNamespace(create=create)),
+        )
+        monkeypatch.setattr(llm_client, "PROMPT_CACHE_KEEPALIVE_SECONDS", 0.01)
+        monkeypatch.setattr(llm_client, "PROMPT_CACHE_KEEPALIVE_IDLE_SECONDS", 0.05)
+        monkeypatch.setattr(llm_client, "_keepalive_task", None)
+        monkeypatch.setattr(llm_client, "_keepalive_prefix", None)
+        first = _build_user_content("x" * 10_000, "suffix")
+        latest = _build_user_content("y" * 10_000, "suffix")
+
+        llm_client._touch_keepalive(first)
+        task = llm_client._keepalive_task
+        assert task is not None
+        llm_client._touch_keepalive(latest)
+        assert llm_client._keepalive_task is task
+
+        await asyncio.wait_for(task, timeout=2)
+        assert calls and all(c == llm_client._keepalive_params(latest[:2]) for c in calls)
+
+    async def test_warns_once_without_a_cacheable_prefix(self, monkeypatch, caplog):
+        monkeypatch.setattr(llm_client, "PROMPT_CACHE_KEEPALIVE_SECONDS", 0.01)
+        monkeypatch.setattr(llm_client, "_keepalive_task", None)
+        monkeypatch.setattr(llm_client, "_keepalive_prefix", None)
+        monkeypatch.setattr(llm_client, "_keepalive_warned", False)
+        short = _build_user_content("short", "suffix")
+        with caplog.at_level("WARNING", logger=llm_client.logger.name):
+            llm_client._touch_keepalive(short)
+            llm_client._touch_keepalive(short)
+        assert llm_client._keepalive_task is None
+        warnings = [r for r in caplog.records if r.levelname == "WARNING"]
+        assert len(warnings) == 1
+        assert "PROMPT_CACHE_KEEPALIVE_SECONDS" in warnings[0].getMessage()
+
+
+class TestClient:
+    def test_client_is_shared_and_key_checked(self, monkeypatch):
+        llm_client._make_client.cache_clear()
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        with pytest.raises(ValueError):
+            llm_client._make_client()
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        try:
+            assert llm_client._make_client() is llm_client._make_client()
+        finally:
+            llm_client._make_client.cache_clear()
+
+
+class TestNoResults:
+    async def test_skips_llm_when_nothing_was_found(self, monkeypatch):
+        def no_client():
+            raise AssertionError("LLM should not be called")
+
+        monkeypatch.setattr(llm_client, "_make_client", no_client)
+        report = await llm_client.analyze_uniqueness(
+            UserProposal(title="Open topic"), [], ["q1", "q2"]
+        )
+        assert report.verdict == Verdict.UNIQUE
+        assert report.confidence == 0.90
+        assert report.search_queries_used == ["q1", "q2"]
+        assert report.total_results_found == 0
+        assert "Open topic" in report.executive_summary
+
+
+class TestEnrichment:
+    def _report(self, comparisons: list[dict]):
+        results = [
+            SimilarityResult(
+                publication=Publication(
+                    id="pub.1140561283",
+                    title="Autonomous Underwater Vehicle Navigation in GPS-Denied Environments",
+                    url="https://dtic.dimensions.ai/details/publication/pub.1140561283",
+                ),
+                similarity_score=0.72,
+            ),
+            SimilarityResult(
+                publication=Publication(id="pub.2", title="Sonar Arrays"),
+                similarity_score=0.41,
+            ),
+        ]
+        proposal = UserProposal(title="AUV navigation")
+        ratings = ["high", "low"]
+        return llm_client._build_report(
+            proposal, results, [], ratings, Verdict.AT_RISK, 0.7,
+            {"comparisons": comparisons},
+        )
+
+    def test_matches_bare_numeric_id(self):
+        report = self._report([{"publication_id": "1140561283", "title": ""}])
+        assert report.comparisons[0].similarity_score == 0.72
+        assert report.comparisons[0].overlap_rating == "high"
+
+    def test_matches_truncated_title(self):
+        report = self._report([{
+            "publication_id": "unknown",
+            "title": "Autonomous Underwater Vehicle Navigation in GPS-Denied",
+        }])
+        assert report.comparisons[0].url.endswith("pub.1140561283")
+
+    def test_enriches_title_matched_only_by_containment(self):
+        report = self._report([
+            {"publication_id": "unknown", "title": "Sonar Arrays for Undersea Detection"},
+            {"publication_id": "unknown", "title": "Adaptive Autonomous Underwater Vehicle "
+                                                  "Navigation in GPS-Denied Environments."},
+        ])
+        sonar, auv = report.comparisons
+        assert sonar.similarity_score == 0.41
+        assert sonar.overlap_rating == "low"
+        assert auv.similarity_score == 0.72
+        assert auv.url == "https://dtic.dimensions.ai/details/publication/pub.1140561283"
+
+    def test_shared_index_is_used(self):
+        index = llm_client.SimilarityIndex([
+            SimilarityResult(
+                publication=Publication(id="pub.7", title="Sonar Arrays", url="https://x/7"),
+                similarity_score=0.9,
+            ),
+        ])
+        assert index.find("7", "").publication.id == "pub.7"
+        assert index.find("unknown", "  SONAR ARRAYS ").publication.id == "pub.7"
+        report = llm_client._build_report(
+            UserProposal(title="t"), [], [], [], Verdict.UNIQUE, 0.5,
+            {"comparisons": [{"publication_id": "pub.7", "title": ""}]},
+            sim_index=index,
+        )
+        assert report.comparisons[0].url == "https://x/7"
+
+    def test_index_falls_back_to_title_containment(self):
+        index = llm_client.SimilarityIndex([
+            SimilarityResult(
+                publication=Publication(
+                    id="pub.1", title="Autonomous Underwater Vehicle Navigation in GPS-Denied Environments",
+                ),
+                similarity_score=0.72,
+            ),
+            SimilarityResult(publication=Publication(id="pub.2", title="Sonar Arrays"), similarity_score=0.41),
+        ])
+        # Short title extended past the original
+        assert index.find("unknown", "Sonar Arrays for Undersea Detection").publication.id == "pub.2"
+        # Trailing punctuation
+        assert index.find("unknown", "sonar arrays.").publication.id == "pub.2"
+        # Long title extended before the prefix length
+        extended = "Adaptive Autonomous Underwater Vehicle Navigation in GPS-Denied Environments"
+        assert index.find("unknown", extended).publication.id == "pub.1"
+        assert index.find("unknown", "Unrelated") is None
+
+    def test_miss_leaves_defaults(self):
+        report = self._report([{"publication_id": "pub.999", "title": "Unrelated"}])
+        assert report.comparisons[0].similarity_score == 0.0
+        assert report.comparisons[0].overlap_rating == "low"
+
+
+class TestParseResponse:
+    def test_plain_json(self):
+        assert llm_client._parse_llm_response('{"a": 1}') == {"a": 1}
+
+    def test_fenced_json(self):
+        text = '```json\n{"a": [1, 2]}\n```'
+        assert llm_client._parse_llm_response(text) == {"a": [1, 2]}
+
+    def test_bare_fence_with_surrounding_whitespace(self):
+        text = '\n  ```\n{"a": "x"}\n```  \n'
+        assert llm_client._parse_llm_response(text) == {"a": "x"}
+
+    def test_fence_without_newline(self):
+        assert llm_client._parse_llm_response('```{"a": 1}```') == {"a": 1}
+
+    def test_fences_inside_strings_are_kept(self):
+        text = '```json\n{"code": "```py\\nx\\n```"}\n```'
+        assert llm_client._parse_llm_response(text) == {"code": "```py\nx\n```"}
@@ -1,5 +1,6 @@
 """Tests for query generation, report formatting, and deterministic scoring."""
 
+import numpy as np
 import pytest
 
 from src.models import (
@@ -11,12 +12,20 @@ from src.models import (
     UserProposal,
     Verdict,
 )
-from src.pipeline import generate_search_queries
-from src.analysis.report import generate_markdown_report, generate_step_summary
+from src.pipeline import _first_principal_axis, _save_report, generate_search_queries
+from src.analysis.report import (
+    _add_executive_summary_links,
+    _ensure_paragraph_breaks,
+    generate_markdown_report,
+    generate_step_summary,
+)
 from src.analysis.scoring import (
+    _OVERLAP_LABELS,
+    _overlap_codes,
     compute_confidence,
     compute_overlap_rating,
     compute_verdict,
+    score_all,
 )
 
 
@@ -79,6 +88,28 @@ class TestQueryGeneration:
         assert "description" not in strategies
 
 
+class TestLandscapeMap:
+    def test_first_principal_axis_matches_full_svd(self):
+        rng = np.random.default_rng(0)
+        emb = rng.standard_normal((60, 32)).astype(np.float32)
+        emb[:, 3] *= 10  # one dominant direction
+        centered = emb - emb.mean(axis=0)
+
+        axis = _first_principal_axis(centered)
+        expected = np.linalg.svd(centered, full_matrices=False)[2][0]
+        assert abs(float(axis @ expected)) > 0.99
+
+
+class TestSaveReport:
+    def test_filename_drops_punctuation(self, tmp_path):
+        path = _save_report("# r", "Drone Swarms: C2/ISR (v2)?", str(tmp_path))
+        assert path.name == "landscape_report_Drone_Swarms_C2ISR_v2.md"
+
+    def test_filename_keeps_unicode_letters(self, tmp_path):
+        path = _save_report("# r", "Café — résumé", str(tmp_path))
+        assert path.name == "landscape_report_Café__résumé.md"
+
+
 class TestReportGeneration:
     @pytest.fixture
     def sample_report(self):
@@ -148,6 +179,29 @@ class TestReportGeneration:
         assert "Landscape Assessment:" in summary
         assert "Topic:" in summary
 
+    def test_paragraph_breaks_skip_lists_and_blank_lines(self):
+        text = "Para one.\nPara two.\n\nIntro:\n- item 1\n  - item 2\nAfter list.\n   \nEnd."
+        assert _ensure_paragraph_breaks(text) == (
+            "Para one.\n\nPara two.\n\nIntro:\n- item 1\n  - item 2\nAfter list.\n   \nEnd."
+        )
+
+
+class TestExecutiveSummaryLinks:
+    def test_overlapping_titles_link_separately(self):
+        text = "Mentions Foo Bar Baz and Foo Bar, then Foo Bar again."
+        linked = _add_executive_summary_links(
+            text, [("Foo Bar", "foo-bar"), ("Foo Bar Baz", "foo-bar-baz")]
+        )
+        assert linked == (
+            "Mentions [Foo Bar Baz](#foo-bar-baz) and [Foo Bar](#foo-bar), then Foo Bar again."
+        )
+
+    def test_already_linked_and_empty_titles_are_skipped(self):
+        text = "See [Sonar Arrays] and Sonar Arrays."
+        assert _add_executive_summary_links(
+            text, [("Sonar Arrays", "sonar-arrays"), ("", "")]
+        ) == text
+
 
 def _make_result(score: float, branches: list[MilitaryBranch] | None = None) -> SimilarityResult:
     """Helper to build a SimilarityResult with a given score and branches."""
@@ -177,6 +231,16 @@ class TestScoring:
         assert compute_overlap_rating(0.50) == "medium"
         assert compute_overlap_rating(0.4999) == "low"
 
+    def test_vectorized_overlap_ratings_match_scalar(self):
+        scores = [0.0, 0.35, 0.4999, 0.50, 0.6999, 0.70, 0.99, float("nan")]
+        codes = _overlap_codes(np.array(scores))
+        assert [_OVERLAP_LABELS[c] for c in codes.tolist()] == [
+            compute_overlap_rating(s) for s in scores
+        ]
+        ratings, _, _ = score_all([_make_result(s) for s in scores[:-1]], "navy")
+        assert ratings == [compute_overlap_rating(s) for s in scores[:-1]]
+        assert score_all([], "navy")[0] == []
+
     def test_verdict_at_risk(self):
         """High overlap + same branch → AT_RISK."""
         results = [_make_result(0.70, [MilitaryBranch.NAVY])]
@@ -249,3 +313,18 @@ class TestScoring:
             verdict = compute_verdict(results, ratings, "navy")
             conf = compute_confidence(results, ratings, verdict)
             assert 0.10 <= conf <= 0.99, f"Confidence {conf} out of range for {verdict}"
+
+    def test_score_all_matches_individual_functions(self):
+        branch_sets = [[], [MilitaryBranch.NAVY], [MilitaryBranch.ARMY, MilitaryBranch.DARPA]]
+        cases = [
+            [],
+            [_make_result(0.35), _make_result(0.32)],
+            [_make_result(0.50, [MilitaryBranch.ARMY]), _make_result(0.55, [MilitaryBranch.NAVY])],
+            [_make_result(0.52, [MilitaryBranch.AIR_FORCE]), _make_result(0.31)],
+            [_make_result(s / 100, branch_sets[s % 3]) for s in range(30, 90, 4)],
+        ]
+        for results in cases:
+            ratings = [compute_overlap_rating(r.similarity_score) for r in results]
+            verdict = compute_verdict(results, ratings, "navy")
+            confidence = compute_confidence(results, ratings, verdict)
+            assert score_all(results, "navy") == (ratings, verdict, confidence)
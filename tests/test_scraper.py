@@ -115,6 +115,17 @@ class TestDimensionsScraper:
         assert MilitaryBranch.ARMY in results[1].detected_branches
         assert MilitaryBranch.DARPA in results[2].detected_branches
 
+    @pytest.mark.asyncio
+    async def test_shared_client_is_left_open(self):
+        async with httpx.AsyncClient() as client:
+            async with DimensionsScraper(delay=0, client=client) as scraper:
+                assert scraper.client is client
+            assert not client.is_closed
+
+        scraper = DimensionsScraper(delay=0)
+        await scraper.close()
+        assert scraper.client.is_closed
+
     @pytest.mark.asyncio
     async def test_fetch_full_abstracts_batch_is_noop(self):
         """Detail pages are JS-rendered, so batch fetch is a passthrough."""
@@ -125,6 +136,51 @@ class TestDimensionsScraper:
         await scraper.close()
         assert result == pubs
 
+    @pytest.mark.asyncio
+    async def test_search_skips_documents_repeated_across_pages(self):
+        fixture_data = json.loads((FIXTURES / "search_results.json").read_text())
+        first_page = {
+            "docs": fixture_data["docs"][:2],
+            "navigation": {"results_json": "/discover/publication/results.json?np=2"},
+        }
+        second_page = {"docs": fixture_data["docs"][1:], "navigation": {"results_json": None}}
+
+        with respx.mock:
+            respx.get(url__startswith="https://dtic.dimensions.ai/discover/publication/results.json").mock(
+                side_effect=[
+                    httpx.Response(200, json=first_page),
+                    httpx.Response(200, json=second_page),
+                ]
+            )
+
+            scraper = DimensionsScraper(delay=0)
+            results = await scraper.search(SearchQuery(text="underwater vehicle", strategy="title"))
+            await scraper.close()
+
+        assert [p.id for p in results] == [doc["id"] for doc in fixture_data["docs"]]
+
+    @pytest.mark.asyncio
+    async def test_cached_pages_skip_the_network(self, monkeypatch, tmp_path):
+        import src.scraper.dimensions as dimensions
+        from src.scraper.response_cache import ResponseCache
+
+        cache = ResponseCache(tmp_path / "responses.sqlite")
+        monkeypatch.setattr(dimensions, "get_response_cache", lambda: cache)
+        fixture_data = json.loads((FIXTURES / "search_results.json").read_text())
+        query = SearchQuery(text="underwater vehicle", strategy="title")
+
+        with respx.mock:
+            route = respx.get(url__startswith="https://dtic.dimensions.ai/discover/publication/results.json").mock(
+                return_value=httpx.Response(200, json=fixture_data)
+            )
+            async with DimensionsScraper(delay=0) as scraper:
+                first = await scraper.search(query)
+                second = await scraper.search(query)
+
+        assert route.call_count == 1
+        assert second == first
+        cache.close()
+
     @pytest.mark.asyncio
     async def test_search_all_deduplicates(self):
         fixture_data = json.loads((FIXTURES / "search_results.json").read_text())
@@ -144,3 +200,35 @@ class TestDimensionsScraper:
 
         # Should deduplicate — same 3 IDs returned for both queries
         assert len(results) == 3
+
+    @pytest.mark.asyncio
+    async def test_search_all_runs_queries_concurrently_in_order(self):
+        import asyncio
+
+        from src.models import Publication
+
+        in_flight = peak = 0
+
+        async def fake_search(query):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 if query.text == "slow" else 0)
+            in_flight -= 1
+            return [
+                Publication(id="pub.shared", title=query.text),
+                Publication(id=f"pub.{query.text}", title=query.text),
+            ]
+
+        scraper = DimensionsScraper(delay=0)
+        scraper.search = fake_search
+        queries = [
+            SearchQuery(text="slow", strategy="title"),
+            SearchQuery(text="fast", strategy="keywords"),
+        ]
+        results = await scraper.search_all(queries)
+        await scraper.close()
+
+        assert peak == 2
+        assert [p.id for p in results] == ["pub.shared", "pub.slow", "pub.fast"]
+        assert results[0].title == "slow"